@@ -0,0 +1,27 @@
+#!/usr/bin/python
+# -*- coding: ISO-8859-15 -*-
+
+# harvest a CSW catalogue into a local SQLite index.  The first run
+# fetches all records, subsequent runs only the records modified since
+
+import sys
+from owslib.csw import CatalogueServiceWeb
+from owslib.catalogue.harvest import HarvestIndex
+
+if len(sys.argv) < 3:
+    print 'Usage: %s <catalogue_url> <database> [maxrecords]' % sys.argv[0]
+    sys.exit(1)
+
+maxrecords = 100
+
+if len(sys.argv) == 4:
+    maxrecords = int(sys.argv[3])
+
+index = HarvestIndex(sys.argv[2])
+csw = CatalogueServiceWeb(sys.argv[1])
+
+print 'Last sync: %s' % index.lastsync(csw.url)
+print 'Harvested %d records' % index.harvest(csw, maxrecords=maxrecords)
+print 'Index holds %d records' % len(index)
+
+index.close()
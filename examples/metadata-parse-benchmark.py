@@ -0,0 +1,51 @@
+#!/usr/bin/python
+# -*- coding: ISO-8859-15 -*-
+
+# time parsing of ISO, DIF and FGDC metadata documents (e.g. the CSW
+# fixtures in tests/resources)
+
+import glob
+import os
+import sys
+import time
+
+from owslib.etree import etree
+from owslib.iso import MD_Metadata
+from owslib.dif import DIF
+from owslib.fgdc import Metadata
+
+iterations = 200
+
+if len(sys.argv) > 1:
+    iterations = int(sys.argv[1])
+
+if len(sys.argv) > 2:
+    files = sys.argv[2:]
+else:
+    resources = os.path.join(os.path.dirname(__file__), '..', 'tests', 'resources')
+    files = glob.glob(os.path.join(resources, '*_iso.xml')) + \
+        glob.glob(os.path.join(resources, '*_dif.xml')) + \
+        glob.glob(os.path.join(resources, '*_fgdc.xml'))
+
+if not files:
+    print 'Usage: %s [iterations] [file ...]' % sys.argv[0]
+    sys.exit(1)
+
+for f in files:
+    doc = etree.parse(f)
+    root = doc.getroot()
+    if root.tag.endswith('MD_Metadata'):
+        parser = MD_Metadata
+    elif root.tag.endswith('DIF'):
+        parser = DIF
+        doc = root
+    else:
+        parser = Metadata
+
+    start = time.time()
+    for i in range(iterations):
+        parser(doc)
+    elapsed = time.time() - start
+
+    print '%-60s %-12s %8.3f ms/parse' % (os.path.basename(f), parser.__name__,
+        elapsed * 1000 / iterations)
@@ -0,0 +1,188 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Federated search over several CSW endpoints
+
+FederatedCatalogue sends the same GetRecords request to many catalogues
+at once, one thread per endpoint, and streams the records back as each
+catalogue answers, de-duplicated by dc:identifier / gmd:fileIdentifier.
+Every endpoint has its own deadline, so a slow or unreachable catalogue
+is reported in the results instead of blocking the others:
+
+    from owslib import fes
+    fc = FederatedCatalogue(['http://example.org/csw', 'http://example.com/csw'])
+    for source, identifier, record in fc.iterrecords([fes.PropertyIsLike('csw:AnyText', '%water%')]):
+        print source, identifier, record.title
+    print fc.results['http://example.com/csw']['latency']
+
+GetCapabilities documents are fetched once per URL and kept in a
+process-wide cache shared by all FederatedCatalogue objects, for
+CAPABILITIES_TTL seconds (or the ttl of the FederatedCatalogue).  Each
+URL has its own lock, so that concurrent searches fetch a document once
+while the other URLs stay available.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from Queue import Queue, Empty
+
+from owslib.csw import CatalogueServiceWeb, namespaces, outputformat
+
+CAPABILITIES_TTL = 3600  # seconds
+
+_capabilities = {}  # (url, lang, version) -> (CatalogueServiceWeb, time fetched)
+_capabilities_locks = {}  # (url, lang, version) -> Lock held while fetching
+_capabilities_lock = threading.Lock()
+
+
+def clear_capabilities_cache():
+    """ Forget all the cached GetCapabilities responses """
+    with _capabilities_lock:
+        _capabilities.clear()
+
+
+class FederatedCatalogue(object):
+    """ Concurrent GetRecords over many CSW endpoints """
+    def __init__(self, urls, lang='en-US', version='2.0.2', timeout=10, ttl=None):
+        """
+
+        Construct a federated catalogue
+
+        Parameters
+        ----------
+
+        - urls: the list of CSW URLs
+        - lang: the language (default is 'en-US')
+        - version: version (default is '2.0.2')
+        - timeout: the time in seconds allowed to each endpoint, per search (default is 10)
+        - ttl: the time in seconds cached GetCapabilities responses are used for (default is CAPABILITIES_TTL)
+
+        """
+
+        self.urls = list(urls)
+        self.lang = lang
+        self.version = version
+        self.timeout = timeout
+        self.ttl = ttl
+        self.records = OrderedDict()
+        self.sources = {}
+        self.results = {}
+
+    def capabilities(self, url):
+        """ Return the (cached) CatalogueServiceWeb object holding the capabilities of url """
+        key = (url, self.lang, self.version)
+        ttl = self.ttl
+        if ttl is None:
+            ttl = CAPABILITIES_TTL
+        with _capabilities_lock:
+            lock = _capabilities_locks.setdefault(key, threading.Lock())
+        with lock:  # a single fetch per URL, the others wait for it
+            with _capabilities_lock:
+                cached = _capabilities.get(key)
+            if cached is not None and time.time() - cached[1] < ttl:
+                return cached[0]
+            csw = CatalogueServiceWeb(url, lang=self.lang, version=self.version, timeout=self.timeout)
+            with _capabilities_lock:
+                _capabilities[key] = (csw, time.time())
+        return csw
+
+    def _query(self, url, queue, kwargs):
+        """ Run a GetRecords request against url and put (url, records, result) in queue """
+        result = {'latency': None, 'matches': None, 'returned': None, 'nextrecord': None, 'error': None}
+        records = {}
+        start = time.time()
+        try:
+            caps = self.capabilities(url)
+            getrecords = [o for o in getattr(caps, 'operations', []) if o.name == 'GetRecords']
+            if getrecords:
+                schemas = getrecords[0].parameters.get('outputSchema', {}).get('values', [])
+                if schemas and kwargs['outputschema'] not in schemas:
+                    raise RuntimeError('outputSchema %s not supported' % kwargs['outputschema'])
+
+            # use a fresh object per request, the cached one may be in use by another search
+            csw = CatalogueServiceWeb(url, lang=self.lang, version=self.version, timeout=self.timeout, skip_caps=True)
+            csw.getrecords2(**kwargs)
+            records = csw.records
+            result.update(csw.results)
+        except Exception, err:
+            result['error'] = str(err) or err.__class__.__name__
+        result['latency'] = time.time() - start
+        queue.put((url, records, result))
+
+    def iterrecords(self, constraints=[], sortby=None, typenames='csw:Record', esn='summary', outputschema=namespaces['csw'], format=outputformat, startposition=0, maxrecords=10, cql=None):
+        """
+
+        Send a GetRecords request to every endpoint concurrently and yield
+        (source URL, identifier, record) tuples as the responses arrive.
+        Records already returned by another endpoint are skipped.  Per
+        endpoint latency, hit counts and errors are kept in self.results.
+
+        Parameters are those of CatalogueServiceWeb.getrecords2
+
+        """
+
+        kwargs = {
+            'constraints': constraints,
+            'sortby': sortby,
+            'typenames': typenames,
+            'esn': esn,
+            'outputschema': outputschema,
+            'format': format,
+            'startposition': startposition,
+            'maxrecords': maxrecords,
+            'cql': cql
+        }
+
+        self.records = OrderedDict()
+        self.sources = {}
+        self.results = {}
+
+        queue = Queue()
+        for url in self.urls:
+            thread = threading.Thread(target=self._query, args=(url, queue, kwargs))
+            thread.daemon = True  # never wait for a catalogue past its deadline
+            thread.start()
+
+        deadline = time.time() + self.timeout
+        pending = set(self.urls)
+
+        while pending:
+            try:
+                url, records, result = queue.get(timeout=max(deadline - time.time(), 0))
+            except Empty:
+                break
+            if url not in pending:
+                continue
+            pending.discard(url)
+            self.results[url] = result
+            for identifier, record in self._merge(url, records):
+                yield url, identifier, record
+
+        for url in pending:
+            self.results[url] = {'latency': None, 'matches': None, 'returned': None,
+                'nextrecord': None, 'error': 'timed out after %s seconds' % self.timeout}
+
+    def _merge(self, url, records):
+        """ Add the records of one endpoint, yielding the (identifier, record) pairs not seen yet """
+        for identifier, record in records.iteritems():
+            if identifier.startswith('owslib_random_'):  # no identifier, never a duplicate
+                identifier = '%s@%s' % (identifier, url)
+            self.sources.setdefault(identifier, []).append(url)
+            if identifier not in self.records:
+                self.records[identifier] = record
+                yield identifier, record
+
+    def getrecords2(self, **kwargs):
+        """
+
+        Send a GetRecords request to every endpoint and collect the
+        merged records in self.records (identifier -> record) and the
+        endpoints holding each record in self.sources (identifier -> URLs)
+
+        Parameters are those of CatalogueServiceWeb.getrecords2
+
+        """
+
+        for source, identifier, record in self.iterrecords(**kwargs):
+            pass
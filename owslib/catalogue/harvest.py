@@ -0,0 +1,272 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Local SQLite harvest index for CSW catalogues
+
+Records fetched through CatalogueServiceWeb.getrecords2 are stored in a
+local SQLite database (identifier, modified, bbox, title, abstract,
+keywords and raw XML).  Subsequent harvests of the same catalogue with
+the same constraints only request the records whose dct:modified is at
+or after the last sync of these constraints, using a
+PropertyIsGreaterThanOrEqualTo constraint (records modified at the
+instant of the last sync are fetched again and replaced), and inserts
+are committed in batches, one transaction per batch.
+
+    from owslib.csw import CatalogueServiceWeb
+    index = HarvestIndex('catalogue.db')
+    csw = CatalogueServiceWeb('http://example.org/csw')
+    index.harvest(csw)  # full harvest the first time
+    index.harvest(csw)  # incremental afterwards
+
+"""
+
+import hashlib
+import sqlite3
+
+from owslib import fes
+from owslib.etree import etree
+from owslib.csw import namespaces
+from owslib.catalogue.records import summarize
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS records (
+        source TEXT NOT NULL,
+        identifier TEXT NOT NULL,
+        modified TEXT,
+        type TEXT,
+        title TEXT,
+        abstract TEXT,
+        keywords TEXT,
+        minx REAL,
+        miny REAL,
+        maxx REAL,
+        maxy REAL,
+        xml TEXT,
+        PRIMARY KEY (source, identifier)
+    )''',
+    'CREATE INDEX IF NOT EXISTS records_modified ON records (source, modified)',
+    '''CREATE TABLE IF NOT EXISTS sync (
+        source TEXT NOT NULL,
+        constraints TEXT NOT NULL,
+        modified TEXT,
+        PRIMARY KEY (source, constraints)
+    )'''
+]
+
+COLUMNS = ['source', 'identifier', 'modified', 'type', 'title', 'abstract',
+           'keywords', 'minx', 'miny', 'maxx', 'maxy', 'xml']
+
+
+def _constraint(constraints):
+    """ Collapse a getrecords2 constraints list into a single OgcExpression """
+    ors = []
+    for c in constraints:
+        if isinstance(c, fes.OgcExpression):
+            ors.append(c)
+        elif len(c) == 1:
+            ors.append(c[0])
+        else:
+            ors.append(fes.And(operations=list(c)))
+    if len(ors) == 1:
+        return ors[0]
+    return fes.Or(operations=ors)
+
+
+def constraints_key(constraints):
+    """ Return the key of the sync of a getrecords2 constraints list, a hash of its XML ('' when empty) """
+    if not constraints:
+        return ''
+    return hashlib.sha1(etree.tostring(_constraint(constraints).toXML())).hexdigest()
+
+
+class HarvestIndex(object):
+    """ SQLite backed store of harvested catalogue records """
+    def __init__(self, database=':memory:', batchsize=500):
+        """
+
+        Open (and create if needed) a harvest index
+
+        Parameters
+        ----------
+
+        - database: path to the SQLite database file (default is ':memory:')
+        - batchsize: number of records committed per transaction (default is 500)
+
+        """
+
+        self.database = database
+        self.batchsize = batchsize
+        self.connection = sqlite3.connect(database)
+        with self.connection:
+            # the sync of a source used to be kept whatever the constraints:
+            # start over, the next harvests are full ones
+            columns = [row[1] for row in self.connection.execute('PRAGMA table_info(sync)')]
+            if columns and 'constraints' not in columns:
+                self.connection.execute('DROP TABLE sync')
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+    def close(self):
+        """ Close the underlying database connection """
+        self.connection.close()
+
+    def lastsync(self, source, constraints=[]):
+        """ Return the most recent dct:modified value harvested from source with constraints, or None """
+        row = self.connection.execute('SELECT modified FROM sync WHERE source = ? AND constraints = ?',
+            (source, constraints_key(constraints))).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def store(self, source, records, constraints=[]):
+        """
+
+        Store parsed records in the index, replacing previous versions,
+        and advance the last sync of source with constraints.  Returns
+        the number of records stored.
+
+        Parameters
+        ----------
+
+        - source: the catalogue the records come from (i.e. the CSW URL)
+        - records: iterable of CswRecord, MD_Metadata, DIF or fgdc Metadata objects
+        - constraints: the constraints the records were selected with (default is none)
+
+        """
+
+        count, latest = self._store(source, records)
+        self._setsync(source, constraints_key(constraints), latest)
+        return count
+
+    def _store(self, source, records):
+        count = 0
+        batch = []
+        latest = None
+
+        for record in records:
+            summary = summarize(record)
+            if summary['identifier'] is None:
+                continue
+            bbox = summary['bbox'] or [None, None, None, None]
+            batch.append((source, summary['identifier'], summary['modified'],
+                summary['type'], summary['title'], summary['abstract'],
+                '\n'.join(summary['keywords']), bbox[0], bbox[1], bbox[2],
+                bbox[3], summary['xml']))
+            if summary['modified'] is not None and (latest is None or summary['modified'] > latest):
+                latest = summary['modified']
+            if len(batch) >= self.batchsize:
+                count += self._flush(batch)
+                batch = []
+
+        if batch:
+            count += self._flush(batch)
+
+        return count, latest
+
+    def _flush(self, batch):
+        with self.connection:  # one transaction per batch
+            self.connection.executemany('INSERT OR REPLACE INTO records (%s) VALUES (%s)' %
+                (', '.join(COLUMNS), ', '.join(['?'] * len(COLUMNS))), batch)
+        return len(batch)
+
+    def _setsync(self, source, key, modified):
+        row = self.connection.execute('SELECT modified FROM sync WHERE source = ? AND constraints = ?',
+            (source, key)).fetchone()
+        if modified is None or (row is not None and row[0] >= modified):
+            return
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO sync (source, constraints, modified) VALUES (?, ?, ?)',
+                (source, key, modified))
+
+    def harvest(self, csw, constraints=[], esn='full', outputschema=namespaces['csw'], maxrecords=100, typenames='csw:Record', full=False):
+        """
+
+        Harvest a catalogue through GetRecords paging, and return the
+        number of records stored.  Unless full is True, only records whose
+        dct:modified is at or after the last sync of this catalogue with
+        these constraints are requested.  The sync is kept per (catalogue,
+        constraints): a harvest with other constraints does not skip the
+        records the former ones left out.
+
+        Parameters
+        ----------
+
+        - csw: a CatalogueServiceWeb object
+        - constraints: additional constraints, as in CatalogueServiceWeb.getrecords2
+        - esn: the ElementSetName 'full', 'brief' or 'summary' (default is 'full')
+        - outputschema: the outputSchema (default is 'http://www.opengis.net/cat/csw/2.0.2')
+        - maxrecords: the number of records requested per page (default is 100)
+        - typenames: the typeNames to query against (default is csw:Record)
+        - full: ignore the last sync and harvest all records (default is False)
+
+        """
+
+        source = csw.url
+        key = constraints_key(constraints)
+        since = None
+        if not full:
+            since = self.lastsync(source, constraints)
+
+        filters = list(constraints)
+        if since is not None:
+            # records modified at the instant of the last sync may not all
+            # have been harvested, they are fetched again and replaced
+            modified = fes.PropertyIsGreaterThanOrEqualTo('dct:modified', since)
+            if filters:
+                filters = [[_constraint(filters), modified]]
+            else:
+                filters = [modified]
+
+        count = 0
+        latest = None
+        startposition = 0
+
+        while True:
+            csw.getrecords2(constraints=filters, typenames=typenames, esn=esn,
+                outputschema=outputschema, startposition=startposition,
+                maxrecords=maxrecords)
+
+            stored, modified = self._store(source, csw.records.values())
+            count += stored
+            if modified is not None and (latest is None or modified > latest):
+                latest = modified
+
+            if csw.results['nextrecord'] == 0 \
+                or csw.results['returned'] == 0 \
+                or csw.results['nextrecord'] > csw.results['matches']:  # exhausted all records
+                break
+
+            startposition = csw.results['nextrecord']
+
+        # only advance the sync once all pages are stored, so an interrupted
+        # harvest is fully retried next time
+        self._setsync(source, key, latest)
+
+        return count
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def records(self, source=None):
+        """ Iterate over the stored records as dicts, optionally for one source """
+        sql = 'SELECT %s FROM records' % ', '.join(COLUMNS)
+        params = ()
+        if source is not None:
+            sql += ' WHERE source = ?'
+            params = (source,)
+        for row in self.connection.execute(sql, params):
+            record = dict(zip(COLUMNS, row))
+            record['keywords'] = [k for k in (record['keywords'] or '').split('\n') if k]
+            yield record
+
+    def getxml(self, identifier, source=None):
+        """ Return the raw XML of a stored record, or None """
+        sql = 'SELECT xml FROM records WHERE identifier = ?'
+        params = (identifier,)
+        if source is not None:
+            sql += ' AND source = ?'
+            params = (identifier, source)
+        row = self.connection.execute(sql, params).fetchone()
+        if row is None:
+            return None
+        return row[0]
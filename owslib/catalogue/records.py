@@ -0,0 +1,120 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Common view of the parsed catalogue records returned by CatalogueServiceWeb
+
+CatalogueServiceWeb.records holds CswRecord, MD_Metadata, DIF or FGDC
+Metadata objects depending on the requested outputSchema.  summarize()
+reduces any of them to the same dict of searchable properties, used by
+the harvest index and the offline search engine.
+"""
+
+from owslib.csw import CswRecord
+from owslib.iso import MD_Metadata
+from owslib.dif import DIF
+from owslib.fgdc import Metadata
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _bbox(minx, miny, maxx, maxy):
+    bbox = [_float(minx), _float(miny), _float(maxx), _float(maxy)]
+    if None in bbox:
+        return None
+    return bbox
+
+
+def _geographic(bbox):
+    """ Whether an ows BoundingBox is in WGS 84 longitude / latitude (EPSG:4326 or CRS84) """
+    if bbox is None or bbox.crs is None:
+        return False
+    return (bbox.crs.authority == 'EPSG' and bbox.crs.code == 4326) or bbox.crs.code == 'CRS84'
+
+
+def summarize(record):
+    """
+
+    Return a dict with the identifier, modified, type, title, abstract,
+    keywords, bbox (WGS 84 [minx, miny, maxx, maxy] or None) and xml of a
+    parsed catalogue record
+
+    Parameters
+    ----------
+
+    - record: a CswRecord, MD_Metadata, DIF or fgdc Metadata object
+
+    """
+
+    summary = {
+        'identifier': None,
+        'modified': None,
+        'type': None,
+        'title': None,
+        'abstract': None,
+        'keywords': [],
+        'bbox': None,
+        'xml': getattr(record, 'xml', None)
+    }
+
+    if isinstance(record, CswRecord):
+        summary['identifier'] = record.identifier
+        summary['modified'] = record.modified
+        summary['type'] = record.type
+        summary['title'] = record.title
+        summary['abstract'] = record.abstract
+        summary['keywords'] = [s for s in record.subjects if s is not None]
+        bbox = record.bbox_wgs84
+        if bbox is None and _geographic(record.bbox):
+            bbox = record.bbox
+        if bbox is not None:
+            summary['bbox'] = _bbox(bbox.minx, bbox.miny, bbox.maxx, bbox.maxy)
+
+    elif isinstance(record, MD_Metadata):
+        summary['identifier'] = record.identifier
+        summary['modified'] = record.datestamp
+        summary['type'] = record.hierarchy
+        ident = record.identification
+        if ident is not None:
+            summary['title'] = ident.title
+            summary['abstract'] = ident.abstract
+            for kw in ident.keywords:
+                summary['keywords'].extend(kw['keywords'])
+            summary['keywords'].extend(ident.topiccategory)
+            bbox = getattr(ident, 'bbox', None)
+            if bbox is not None:
+                summary['bbox'] = _bbox(bbox.minx, bbox.miny, bbox.maxx, bbox.maxy)
+
+    elif isinstance(record, DIF):
+        summary['identifier'] = record.identifier
+        summary['modified'] = record.last_dif_revision_date
+        summary['title'] = record.title
+        summary['abstract'] = record.summary
+        summary['keywords'] = [k for k in record.keyword + record.parameters if k is not None]
+        if record.spatial_coverage:
+            sc = record.spatial_coverage[0]
+            summary['bbox'] = _bbox(sc.minx, sc.miny, sc.maxx, sc.maxy)
+
+    elif isinstance(record, Metadata):
+        summary['identifier'] = getattr(record, 'identifier', None)
+        summary['modified'] = record.metainfo.metd
+        idinfo = record.idinfo
+        if hasattr(idinfo.citation, 'citeinfo'):
+            summary['title'] = idinfo.citation.citeinfo['title']
+        if hasattr(idinfo, 'descript'):
+            summary['abstract'] = idinfo.descript.abstract
+        if hasattr(idinfo, 'keywords'):
+            for theme in idinfo.keywords.theme:
+                summary['keywords'].extend(theme['themekey'])
+        if hasattr(idinfo, 'spdom') and hasattr(idinfo.spdom, 'bbox'):
+            bbox = idinfo.spdom.bbox
+            summary['bbox'] = _bbox(bbox.minx, bbox.miny, bbox.maxx, bbox.maxy)
+
+    else:
+        raise TypeError('Unsupported record type: %s' % record.__class__.__name__)
+
+    return summary
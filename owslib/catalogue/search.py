@@ -0,0 +1,466 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Offline full-text and spatial search over catalogue records
+
+SearchIndex keeps an inverted index of the title, abstract and keyword
+tokens of CswRecord / MD_Metadata (or DIF, FGDC) objects, a dict index
+on dc:type and dc:identifier, a sorted index on dct:modified and a grid
+index of bounding boxes.  It answers queries written with the same
+owslib.fes expressions used for CatalogueServiceWeb.getrecords2, so
+most GetRecords requests can be answered locally:
+
+    from owslib import fes
+    index = SearchIndex(csw.records.values())
+    index.search([[fes.PropertyIsLike('csw:AnyText', '*water*', wildCard='*'),
+                   fes.BBox([-80, 40, -70, 50])]])
+
+Supported expressions are PropertyIsLike, PropertyIsEqualTo,
+PropertyIsNotEqualTo, PropertyIsLessThan(OrEqualTo),
+PropertyIsGreaterThan(OrEqualTo), PropertyIsBetween, PropertyIsNull,
+BBox, And, Or and Not.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from owslib import fes
+from owslib.catalogue.records import summarize
+
+# queryable name -> summary property
+QUERYABLES = {
+    'csw:AnyText': 'anytext',
+    'apiso:AnyText': 'anytext',
+    'dc:title': 'title',
+    'apiso:Title': 'title',
+    'dct:abstract': 'abstract',
+    'apiso:Abstract': 'abstract',
+    'dc:subject': 'keywords',
+    'apiso:Subject': 'keywords',
+    'dc:type': 'type',
+    'apiso:Type': 'type',
+    'dc:identifier': 'identifier',
+    'apiso:Identifier': 'identifier',
+    'dct:modified': 'modified',
+    'apiso:Modified': 'modified',
+}
+
+TEXT_PROPERTIES = ['title', 'abstract', 'keywords']
+
+MAX_CELLS = 1024  # cells of a bbox beyond which it is scanned instead
+
+token_re = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """ Return the lower-cased word tokens of text """
+    if not text:
+        return []
+    return token_re.findall(text.lower())
+
+
+def _like_regex(expression):
+    """ Compile a PropertyIsLike literal into a case-insensitive regular expression """
+    pattern = []
+    literal = expression.literal
+    i = 0
+    while i < len(literal):
+        char = literal[i]
+        if char == expression.escapeChar and i + 1 < len(literal):
+            i += 1
+            pattern.append(re.escape(literal[i]))
+        elif char == expression.wildCard:
+            pattern.append('.*')
+        elif char == expression.singleChar:
+            pattern.append('.')
+        else:
+            pattern.append(re.escape(char))
+        i += 1
+    return re.compile('^%s$' % ''.join(pattern), re.IGNORECASE | re.DOTALL | re.UNICODE)
+
+
+def _like_tokens(expression):
+    """ Return the word tokens that must appear in any value matching a PropertyIsLike literal """
+    special = [expression.wildCard, expression.singleChar]
+    fragments = []
+    current = []
+    literal = expression.literal
+    i = 0
+    while i < len(literal):
+        char = literal[i]
+        if char == expression.escapeChar and i + 1 < len(literal):
+            i += 1
+            current.append(literal[i])
+        elif char in special:
+            fragments.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    fragments.append(''.join(current))
+
+    tokens = []
+    for fragment in fragments:
+        tokens.extend(tokenize(fragment))
+    return tokens
+
+
+class SearchIndex(object):
+    """ In-memory inverted, attribute, temporal and spatial index of catalogue records """
+    def __init__(self, records=[], cellsize=10.0):
+        """
+
+        Build a search index
+
+        Parameters
+        ----------
+
+        - records: iterable of CswRecord, MD_Metadata, DIF or fgdc Metadata objects
+        - cellsize: size in degrees of the bbox grid cells (default is 10.0)
+
+        """
+
+        self.cellsize = cellsize
+        self.records = OrderedDict()  # identifier -> record
+        self._summaries = {}  # identifier -> summary
+        self._postings = {}  # token -> set of identifiers
+        self._vocabulary_cache = {}  # query token -> set of vocabulary tokens
+        self._values = {'type': {}, 'identifier': {}}  # property -> value -> set of identifiers
+        self._modified = []  # sorted list of (modified, identifier)
+        self._cells = {}  # (col, row) -> set of identifiers
+        self._large = set()  # identifiers of the bboxes over more than MAX_CELLS cells, always tested
+        self._nobbox = set()
+
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record, summary=None):
+        """
+
+        Add (or replace) a record
+
+        Parameters
+        ----------
+
+        - record: a CswRecord, MD_Metadata, DIF or fgdc Metadata object
+        - summary: the record summary (default is owslib.catalogue.records.summarize(record))
+
+        """
+
+        if summary is None:
+            summary = summarize(record)
+        identifier = summary['identifier']
+        if identifier is None:
+            return
+        if identifier in self.records:
+            self.remove(identifier)
+
+        self.records[identifier] = record
+        self._summaries[identifier] = summary
+
+        for token in self._tokens(summary):
+            if token not in self._postings:
+                self._vocabulary_cache = {}
+                self._postings[token] = set()
+            self._postings[token].add(identifier)
+
+        for prop in self._values:
+            self._values[prop].setdefault(summary[prop], set()).add(identifier)
+
+        if summary['modified'] is not None:
+            item = (summary['modified'], identifier)
+            self._modified.insert(bisect_left(self._modified, item), item)
+
+        if summary['bbox'] is None:
+            self._nobbox.add(identifier)
+        else:
+            cells = self._bboxcells(summary['bbox'])
+            if cells is None:
+                self._large.add(identifier)
+            else:
+                for cell in cells:
+                    self._cells.setdefault(cell, set()).add(identifier)
+
+    def load(self, harvestindex, source=None):
+        """
+
+        Add the records stored in a HarvestIndex.  The records are the
+        dicts returned by HarvestIndex.records
+
+        Parameters
+        ----------
+
+        - harvestindex: an owslib.catalogue.harvest.HarvestIndex object
+        - source: only load the records harvested from this catalogue (default is all)
+
+        """
+
+        for row in harvestindex.records(source):
+            summary = dict(row)
+            summary['bbox'] = None
+            if None not in [row['minx'], row['miny'], row['maxx'], row['maxy']]:
+                summary['bbox'] = [row['minx'], row['miny'], row['maxx'], row['maxy']]
+            self.add(row, summary)
+
+    def remove(self, identifier):
+        """ Remove a record from the index """
+        summary = self._summaries.pop(identifier)
+        del self.records[identifier]
+
+        for token in self._tokens(summary):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.discard(identifier)
+                if not postings:
+                    del self._postings[token]
+                    self._vocabulary_cache = {}
+
+        for prop in self._values:
+            self._values[prop][summary[prop]].discard(identifier)
+
+        if summary['modified'] is not None:
+            i = bisect_left(self._modified, (summary['modified'], identifier))
+            del self._modified[i]
+
+        if summary['bbox'] is None:
+            self._nobbox.discard(identifier)
+        else:
+            cells = self._bboxcells(summary['bbox'])
+            if cells is None:
+                self._large.discard(identifier)
+            else:
+                for cell in cells:
+                    self._cells[cell].discard(identifier)
+
+    def _tokens(self, summary):
+        tokens = set(tokenize(summary['title']))
+        tokens.update(tokenize(summary['abstract']))
+        for keyword in summary['keywords']:
+            tokens.update(tokenize(keyword))
+        return tokens
+
+    def _bboxcells(self, bbox):
+        """ Cells of bbox, None when there are more than MAX_CELLS of them """
+        minx, miny, maxx, maxy = bbox
+        size = self.cellsize
+        if not all(abs(v) < float('inf') for v in bbox) or \
+                ((maxx - minx) / size + 1) * ((maxy - miny) / size + 1) > MAX_CELLS:
+            return None
+        return [(col, row) for col in xrange(int((minx + 180) // size), int((maxx + 180) // size) + 1)
+                for row in xrange(int((miny + 90) // size), int((maxy + 90) // size) + 1)]
+
+    def _text(self, summary, prop):
+        if prop == 'anytext':
+            return [summary['title'], summary['abstract']] + summary['keywords']
+        if prop == 'keywords':
+            return summary['keywords']
+        return [summary[prop]]
+
+    def _property(self, expression):
+        try:
+            return QUERYABLES[expression.propertyname]
+        except KeyError:
+            raise ValueError('Unsupported queryable: %s' % expression.propertyname)
+
+    def _candidates(self, tokens):
+        """ Identifiers of records holding every token (as a substring of an indexed token) """
+        candidates = None
+        for token in tokens:
+            matches = self._vocabulary_cache.get(token)
+            if matches is None:
+                matches = set([t for t in self._postings if token in t])
+                self._vocabulary_cache[token] = matches
+            ids = set()
+            for t in matches:
+                ids.update(self._postings[t])
+            if candidates is None:
+                candidates = ids
+            else:
+                candidates &= ids
+            if not candidates:
+                break
+        return candidates
+
+    def _like(self, expression):
+        prop = self._property(expression)
+        regex = _like_regex(expression)
+        candidates = None
+        if prop in TEXT_PROPERTIES or prop == 'anytext':
+            candidates = self._candidates(_like_tokens(expression))
+        if candidates is None:
+            candidates = self.records.keys()
+
+        result = set()
+        for identifier in candidates:
+            for value in self._text(self._summaries[identifier], prop):
+                if value is not None and regex.match(value):
+                    result.add(identifier)
+                    break
+        return result
+
+    def _compare(self, expression, op):
+        prop = self._property(expression)
+        literal = expression.literal
+        matchcase = getattr(expression, 'matchcase', True)
+
+        if op == '=' and prop in self._values and matchcase:
+            return set(self._values[prop].get(literal, set()))
+
+        if prop == 'modified' and op != '!=':
+            if op == '=':
+                lo = bisect_left(self._modified, (literal,))
+                hi = bisect_right(self._modified, (literal, u'\U0010ffff'))
+            elif op == '<':
+                lo, hi = 0, bisect_left(self._modified, (literal,))
+            elif op == '<=':
+                lo, hi = 0, bisect_right(self._modified, (literal, u'\U0010ffff'))
+            elif op == '>':
+                lo, hi = bisect_right(self._modified, (literal, u'\U0010ffff')), len(self._modified)
+            else:  # >=
+                lo, hi = bisect_left(self._modified, (literal,)), len(self._modified)
+            return set([identifier for modified, identifier in self._modified[lo:hi]])
+
+        if not matchcase:
+            literal = literal.lower()
+
+        result = set()
+        for identifier, summary in self._summaries.iteritems():
+            for value in self._text(summary, prop):
+                if value is None:
+                    continue
+                if not matchcase:
+                    value = value.lower()
+                if ((op == '=' and value == literal) or
+                    (op == '!=' and value != literal) or
+                    (op == '<' and value < literal) or
+                    (op == '<=' and value <= literal) or
+                    (op == '>' and value > literal) or
+                    (op == '>=' and value >= literal)):
+                    result.add(identifier)
+                    break
+        return result
+
+    def _bbox(self, expression):
+        minx, miny, maxx, maxy = [float(v) for v in expression.bbox]
+        cells = self._bboxcells([minx, miny, maxx, maxy])
+        if cells is None:  # too large a query, scan the bboxes
+            candidates = set(self.records.keys()) - self._nobbox
+        else:
+            candidates = set(self._large)
+            for cell in cells:
+                candidates.update(self._cells.get(cell, ()))
+
+        result = set()
+        for identifier in candidates:
+            bbox = self._summaries[identifier]['bbox']
+            if bbox[0] <= maxx and bbox[2] >= minx and bbox[1] <= maxy and bbox[3] >= miny:
+                result.add(identifier)
+        return result
+
+    def evaluate(self, expression):
+        """ Return the set of identifiers of the records matching an owslib.fes expression """
+        if isinstance(expression, fes.And):
+            result = None
+            for op in expression.operations:
+                ids = self.evaluate(op)
+                result = ids if result is None else result & ids
+                if not result:
+                    break
+            return result
+        elif isinstance(expression, fes.Or):
+            result = set()
+            for op in expression.operations:
+                result |= self.evaluate(op)
+            return result
+        elif isinstance(expression, fes.Not):
+            result = set(self.records.keys())
+            for op in expression.operations:
+                result -= self.evaluate(op)
+            return result
+        elif isinstance(expression, fes.PropertyIsLike):
+            return self._like(expression)
+        elif isinstance(expression, fes.PropertyIsEqualTo):
+            return self._compare(expression, '=')
+        elif isinstance(expression, fes.PropertyIsNotEqualTo):
+            return self._compare(expression, '!=')
+        elif isinstance(expression, fes.PropertyIsLessThan):
+            return self._compare(expression, '<')
+        elif isinstance(expression, fes.PropertyIsLessThanOrEqualTo):
+            return self._compare(expression, '<=')
+        elif isinstance(expression, fes.PropertyIsGreaterThan):
+            return self._compare(expression, '>')
+        elif isinstance(expression, fes.PropertyIsGreaterThanOrEqualTo):
+            return self._compare(expression, '>=')
+        elif isinstance(expression, fes.PropertyIsBetween):
+            lower = fes.PropertyIsGreaterThanOrEqualTo(expression.propertyname, '%s' % expression.lower)
+            upper = fes.PropertyIsLessThanOrEqualTo(expression.propertyname, '%s' % expression.upper)
+            return self._compare(lower, '>=') & self._compare(upper, '<=')
+        elif isinstance(expression, fes.PropertyIsNull):
+            prop = self._property(expression)
+            return set([i for i, s in self._summaries.iteritems() if s.get(prop) in (None, [])])
+        elif isinstance(expression, fes.BBox):
+            return self._bbox(expression)
+        raise ValueError('Unsupported expression: %s' % expression.__class__.__name__)
+
+    def query(self, constraints=[]):
+        """
+
+        Return the identifiers of the records matching a list of
+        constraints, in index order.  The list is interpreted as in
+        CatalogueServiceWeb.getrecords2: [a, b] is a || b, [[a, b]] is a && b
+
+        Parameters
+        ----------
+
+        - constraints: the list of constraints (OgcExpression from owslib.fes module)
+
+        """
+
+        if not constraints:
+            return self.records.keys()
+
+        result = set()
+        for c in constraints:
+            if isinstance(c, fes.OgcExpression):
+                result |= self.evaluate(c)
+            elif len(c) == 1:
+                result |= self.evaluate(c[0])
+            else:
+                result |= self.evaluate(fes.And(operations=list(c)))
+
+        return [i for i in self.records if i in result]
+
+    def search(self, constraints=[], startposition=0, maxrecords=10):
+        """
+
+        Search the index, returning a dict shaped like
+        CatalogueServiceWeb.results plus the matching 'records'
+
+        Parameters
+        ----------
+
+        - constraints: the list of constraints (OgcExpression from owslib.fes module)
+        - startposition: requests a slice of the result set, starting at this position (default is 0)
+        - maxrecords: the maximum number of records to return (default is 10)
+
+        """
+
+        matches = self.query(constraints)
+        start = max(startposition - 1, 0)
+        page = matches[start:start + maxrecords]
+
+        nextrecord = start + len(page) + 1
+        if nextrecord > len(matches):
+            nextrecord = 0
+
+        results = {
+            'matches': len(matches),
+            'returned': len(page),
+            'nextrecord': nextrecord,
+            'records': OrderedDict([(i, self.records[i]) for i in page])
+        }
+        return results
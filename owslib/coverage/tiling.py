@@ -0,0 +1,432 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Tiled GetCoverage requests assembled into a single raster
+
+WCS servers reject or time out on large bbox / width / height requests.
+CoverageTiles splits the pixels of a coverage grid (the RectifiedGrid of
+its DescribeCoverage document) intersecting a bounding box into tiles of
+at most tilesize pixels.  The bbox of each tile is made of the edges of
+its pixels, and its width / height are its number of pixels, so that the
+server answers the very pixels of the grid: consecutive tiles share their
+edges but no pixel, and the mosaic has neither gaps nor duplicates at the
+seams.  The tiles are fetched concurrently, streamed to temporary files,
+decoded (uncompressed TIFF / GeoTIFF, or raw values) and written in place
+in the output file by a RawWriter or GeoTiffWriter:
+
+    tiles = CoverageTiles(wcs, 'dem', bbox=(0, 40, 10, 50), crs='EPSG:4326', format='GeoTIFF', tilesize=(1024, 1024))
+    tiles.save('dem.tif', typecode='f', nodata=-9999, geotiff=True, epsg=4326, geographic=True)
+
+"""
+
+import math
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from multiprocessing.pool import ThreadPool
+
+# TIFF field types -> struct format of one value
+_TIFF_TYPES = {1: 'B', 2: 'c', 3: 'H', 4: 'I', 5: 'II', 6: 'b', 7: 'B', 8: 'h', 9: 'i', 10: 'ii', 11: 'f', 12: 'd'}
+
+# (BitsPerSample, SampleFormat) -> array typecode
+_TIFF_SAMPLES = {(8, 1): 'B', (8, 2): 'b', (16, 1): 'H', (16, 2): 'h', (32, 1): 'I', (32, 2): 'i',
+                 (32, 3): 'f', (64, 3): 'd'}
+
+_NATIVE = sys.byteorder == 'little' and '<' or '>'
+
+
+def _typecode(bits, sampleformat):
+    typecode = _TIFF_SAMPLES.get((bits, sampleformat))
+    if typecode is None or array(typecode).itemsize * 8 != bits:
+        raise ValueError('Unsupported TIFF samples: %d bits, format %d' % (bits, sampleformat))
+    return typecode
+
+
+def read_tiff(path):
+    """
+
+    Read a single band, uncompressed, striped TIFF (or GeoTIFF) file,
+    returns (width, height, array of the values row by row)
+
+    Parameters
+    ----------
+
+    - path: path of the TIFF file
+
+    """
+
+    f = open(path, 'rb')
+    try:
+        head = f.read(8)
+        if head[:2] == 'II':
+            order = '<'
+        elif head[:2] == 'MM':
+            order = '>'
+        else:
+            raise ValueError('Not a TIFF file: %s' % path)
+        magic, offset = struct.unpack(order + 'HI', head[2:8])
+        if magic != 42:
+            raise ValueError('Not a TIFF file: %s' % path)
+
+        f.seek(offset)
+        count = struct.unpack(order + 'H', f.read(2))[0]
+        fields = {}
+        for i in range(count):
+            tag, type, n, value = struct.unpack(order + 'HHI4s', f.read(12))
+            if type not in _TIFF_TYPES:
+                continue
+            format = order + _TIFF_TYPES[type] * n
+            size = struct.calcsize(format)
+            if size > 4:
+                position = f.tell()
+                f.seek(struct.unpack(order + 'I', value)[0])
+                value = f.read(size)
+                f.seek(position)
+            fields[tag] = struct.unpack(format, value[:size])
+
+        width, height = fields[256][0], fields[257][0]
+        if fields.get(259, (1,))[0] != 1:
+            raise ValueError('Unsupported TIFF compression: %d' % fields[259][0])
+        if fields.get(277, (1,))[0] != 1:
+            raise ValueError('Unsupported TIFF: %d samples per pixel' % fields[277][0])
+        if 273 not in fields:
+            raise ValueError('Unsupported TIFF: no strips')
+        typecode = _typecode(fields.get(258, (1,))[0], fields.get(339, (1,))[0])
+
+        values = array(typecode)
+        for offset, size in zip(fields[273], fields[279]):
+            f.seek(offset)
+            values.fromstring(f.read(size))
+    finally:
+        f.close()
+
+    if order != _NATIVE:
+        values.byteswap()
+    if len(values) != width * height:
+        raise ValueError('Truncated TIFF file: %s' % path)
+    return width, height, values
+
+
+def read_raw(path, typecode='f'):
+    """
+
+    Read a file of raw values in the byte order of the machine, returns an array
+
+    Parameters
+    ----------
+
+    - path: path of the file
+    - typecode: array typecode of the values (default is 'f', 32 bits floats)
+
+    """
+
+    values = array(typecode)
+    f = open(path, 'rb')
+    try:
+        values.fromstring(f.read())
+    finally:
+        f.close()
+    return values
+
+
+def _decode(path, width, height, typecode):
+    f = open(path, 'rb')
+    try:
+        head = f.read(4)
+    finally:
+        f.close()
+    if head in ['II*\x00', 'MM\x00*']:
+        w, h, values = read_tiff(path)
+        if (w, h) != (width, height):
+            raise ValueError('Tile of %dx%d pixels, expected %dx%d' % (w, h, width, height))
+        return values
+    values = read_raw(path, typecode)
+    if len(values) != width * height:
+        raise ValueError('Tile of %d values, expected %dx%d' % (len(values), width, height))
+    return values
+
+
+class RawWriter(object):
+    """ Raster file of raw values, row by row from the top left pixel, written tile by tile """
+    header = ''
+
+    def __init__(self, path, width, height, typecode='f', nodata=None):
+        """
+
+        Create the file, every pixel set to nodata
+
+        Parameters
+        ----------
+
+        - path: path of the output file
+        - width: number of columns
+        - height: number of rows
+        - typecode: array typecode of the values (default is 'f', 32 bits floats)
+        - nodata: value of the pixels not written (default is 0)
+
+        """
+
+        self.path = path
+        self.width = width
+        self.height = height
+        self.typecode = typecode
+        self.nodata = nodata
+        self.itemsize = array(typecode).itemsize
+        self._lock = threading.Lock()
+        self._file = open(path, 'w+b')
+        self._file.write(self.header)
+        self._offset = len(self.header)
+        if nodata:
+            row = array(typecode, [nodata]) * width
+            for i in range(height):
+                row.tofile(self._file)
+        else:
+            self._file.truncate(self._offset + width * height * self.itemsize)
+
+    def write(self, col, row, width, height, values):
+        """ Write the values of a tile, row by row, its top left pixel at (col, row) """
+        if col < 0 or row < 0 or col + width > self.width or row + height > self.height:
+            raise ValueError('Tile outside of the raster')
+        if len(values) != width * height:
+            raise ValueError('Tile of %d values, expected %dx%d' % (len(values), width, height))
+        if not isinstance(values, array) or values.typecode != self.typecode:
+            values = array(self.typecode, values)
+        with self._lock:
+            for i in range(height):
+                self._file.seek(self._offset + ((row + i) * self.width + col) * self.itemsize)
+                values[i * width:(i + 1) * width].tofile(self._file)
+
+    def close(self):
+        self._file.close()
+
+
+class GeoTiffWriter(RawWriter):
+    """ Single band, uncompressed GeoTIFF file, written tile by tile """
+
+    def __init__(self, path, width, height, typecode='f', nodata=None, corner=(0.0, 0.0), pixelsize=(1.0, 1.0),
+                 epsg=None, geographic=False):
+        """
+
+        Create the file, every pixel set to nodata
+
+        Parameters
+        ----------
+
+        - path: path of the output file
+        - width: number of columns
+        - height: number of rows
+        - typecode: array typecode of the values (default is 'f', 32 bits floats)
+        - nodata: value of the pixels not written (default is 0)
+        - corner: (x, y) of the top left corner of the top left pixel
+        - pixelsize: (width, height) of the pixels in CRS units
+        - epsg: optional EPSG code of the CRS
+        - geographic: True when the CRS is a geographic one (default is False, projected)
+
+        """
+
+        bits = array(typecode).itemsize * 8
+        sampleformat = [f for (b, f), t in _TIFF_SAMPLES.items() if t == typecode and b == bits]
+        if not sampleformat:
+            raise ValueError('Unsupported GeoTIFF typecode: %s' % typecode)
+        if width * height * bits // 8 >= 2 ** 32:
+            raise ValueError('Raster too large for a TIFF file, use a RawWriter')
+
+        geokeys = [1, 1, 0, 0,
+                   1024, 0, 1, geographic and 2 or 1,  # GTModelTypeGeoKey
+                   1025, 0, 1, 1]  # GTRasterTypeGeoKey: PixelIsArea
+        if epsg is not None:
+            geokeys.extend([geographic and 2048 or 3072, 0, 1, int(epsg)])
+        geokeys[3] = len(geokeys) // 4 - 1
+
+        fields = [(256, 4, [width]), (257, 4, [height]), (258, 3, [bits]), (259, 3, [1]), (262, 3, [1]),
+                  (273, 4, [0]), (277, 3, [1]), (278, 4, [height]), (279, 4, [width * height * bits // 8]),
+                  (284, 3, [1]), (339, 3, sampleformat),
+                  (33550, 12, [pixelsize[0], pixelsize[1], 0.0]),
+                  (33922, 12, [0.0, 0.0, 0.0, corner[0], corner[1], 0.0]),
+                  (34735, 3, geokeys)]
+        if nodata is not None:
+            fields.append((42113, 2, list(repr(nodata) + '\x00')))
+
+        # header, directory and the values that do not fit in an entry, then the raster
+        start = 8 + 2 + 12 * len(fields) + 4
+        extra = ''
+        entries = ''
+        for tag, type, values in fields:
+            if tag == 273:
+                strip = len(entries)
+            data = struct.pack(_NATIVE + _TIFF_TYPES[type] * len(values), *values)
+            if len(data) > 4:
+                entries += struct.pack(_NATIVE + 'HHII', tag, type, len(values), start + len(extra))
+                extra += data
+                if len(extra) % 2:
+                    extra += '\x00'
+            else:
+                entries += struct.pack(_NATIVE + 'HHI', tag, type, len(values)) + data.ljust(4, '\x00')
+        offset = start + len(extra)
+        offset += -offset % 8
+        entries = entries[:strip + 8] + struct.pack(_NATIVE + 'I', offset) + entries[strip + 12:]
+        header = (_NATIVE == '<' and 'II' or 'MM') + struct.pack(_NATIVE + 'HI', 42, 8)
+        header += struct.pack(_NATIVE + 'H', len(fields)) + entries + struct.pack(_NATIVE + 'I', 0) + extra
+        self.header = header.ljust(offset, '\x00')
+        super(GeoTiffWriter, self).__init__(path, width, height, typecode, nodata)
+
+
+class CoverageTiles(object):
+    """ GetCoverage of a bounding box split into tiles aligned on the coverage grid """
+
+    def __init__(self, service, identifier, bbox=None, crs=None, format='GeoTIFF', tilesize=(512, 512),
+                 grid=None, maxConcurrent=4, tmpdir=None, **kwargs):
+        """
+
+        Plan the tiles
+
+        Parameters
+        ----------
+
+        - service: WebCoverageService (1.0.0)
+        - identifier: coverage identifier
+        - bbox: (minx, miny, maxx, maxy) in the CRS of the grid (default is the whole grid)
+        - crs: CRS of the grid, passed to GetCoverage
+        - format: format of the tiles, TIFF / GeoTIFF or raw values (default is 'GeoTIFF')
+        - tilesize: maximum (width, height) of a tile in pixels (default is 512 x 512)
+        - grid: RectifiedGrid of the coverage (default is the grid of its DescribeCoverage document)
+        - maxConcurrent: maximum number of requests in progress at once (default is 4)
+        - tmpdir: directory of the temporary tile files (default is that of the system)
+        - kwargs: any other GetCoverage parameter
+
+        """
+
+        if grid is None:
+            grid = service.contents[identifier].grid
+        if not hasattr(grid, 'origin'):
+            raise ValueError('The grid of %s is not a RectifiedGrid' % identifier)
+        (dx, rx), (ry, dy) = [[float(v) for v in vector[:2]] for vector in grid.offsetvectors[:2]]
+        if rx or ry or not dx or not dy:
+            raise ValueError('Rotated grids are not supported')
+
+        self.service = service
+        self.identifier = identifier
+        self.crs = crs
+        self.format = format
+        self.maxConcurrent = maxConcurrent
+        self.tmpdir = tmpdir
+        self.kwargs = kwargs
+        self.origin = [float(v) for v in grid.origin[:2]]
+        self.offsets = (dx, dy)
+        self.pixelsize = (abs(dx), abs(dy))
+
+        # pixel i covers [origin + (i - 0.5) * offset, origin + (i + 0.5) * offset]
+        low = [int(v) for v in grid.lowlimits[:2]]
+        high = [int(v) + 1 for v in grid.highlimits[:2]]
+        if bbox is not None:
+            for axis, (a, b) in enumerate([(bbox[0], bbox[2]), (bbox[1], bbox[3])]):
+                a, b = sorted([round(self._pixel(axis, a), 6), round(self._pixel(axis, b), 6)])
+                low[axis] = max(low[axis], int(math.floor(a)))
+                high[axis] = min(high[axis], int(math.ceil(b)))
+        if high[0] <= low[0] or high[1] <= low[1]:
+            raise ValueError('The bbox does not intersect the grid of %s' % identifier)
+        self.window = (low[0], low[1], high[0], high[1])
+        self.width = high[0] - low[0]
+        self.height = high[1] - low[1]
+
+        xs = [self._edge(0, low[0]), self._edge(0, high[0])]
+        ys = [self._edge(1, low[1]), self._edge(1, high[1])]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+        self.corner = (self.bbox[0], self.bbox[3])
+
+        self.tiles = []
+        for j in range(low[1], high[1], tilesize[1]):
+            for i in range(low[0], high[0], tilesize[0]):
+                self.tiles.append(self._tile(i, j, min(i + tilesize[0], high[0]), min(j + tilesize[1], high[1])))
+
+    def _pixel(self, axis, coordinate):
+        return (coordinate - self.origin[axis]) / self.offsets[axis] + 0.5
+
+    def _edge(self, axis, index):
+        return self.origin[axis] + (index - 0.5) * self.offsets[axis]
+
+    def _tile(self, i0, j0, i1, j1):
+        xs = [self._edge(0, i0), self._edge(0, i1)]
+        ys = [self._edge(1, j0), self._edge(1, j1)]
+        # rows from the top, columns from the left, whatever the direction of the offsets
+        if self.offsets[0] > 0:
+            col = i0 - self.window[0]
+        else:
+            col = self.window[2] - i1
+        if self.offsets[1] < 0:
+            row = j0 - self.window[1]
+        else:
+            row = self.window[3] - j1
+        return {'bbox': (min(xs), min(ys), max(xs), max(ys)), 'col': col, 'row': row,
+                'width': i1 - i0, 'height': j1 - j0, 'error': None}
+
+    def _get(self, tile, writer):
+        fd, path = tempfile.mkstemp(suffix='.tile', dir=self.tmpdir)
+        os.close(fd)
+        try:
+            self.service.getCoverage(identifier=self.identifier, bbox=tile['bbox'], crs=self.crs, format=self.format,
+                                     width=tile['width'], height=tile['height'], output=path, **self.kwargs)
+            values = _decode(path, tile['width'], tile['height'], writer.typecode)
+            writer.write(tile['col'], tile['row'], tile['width'], tile['height'], values)
+        except Exception, err:
+            tile['error'] = err
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run(self, writer):
+        """ Fetch the tiles and write them with writer (a RawWriter of width x height pixels), the outcome of each tile is kept in self.tiles """
+        if (writer.width, writer.height) != (self.width, self.height):
+            raise ValueError('Writer of %dx%d pixels, expected %dx%d' % (writer.width, writer.height, self.width, self.height))
+        for tile in self.tiles:
+            tile['error'] = None
+        if len(self.tiles) > 1 and self.maxConcurrent > 1:
+            pool = ThreadPool(min(self.maxConcurrent, len(self.tiles)))
+            try:
+                pool.map(lambda tile: self._get(tile, writer), self.tiles)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for tile in self.tiles:
+                self._get(tile, writer)
+
+    def errors(self):
+        """ Return the tiles that failed """
+        return [tile for tile in self.tiles if tile['error'] is not None]
+
+    def save(self, path, typecode='f', nodata=None, geotiff=True, epsg=None, geographic=False, ignore_errors=False):
+        """
+
+        Fetch the tiles into a GeoTIFF or raw file, returns the tiles that
+        failed, left to nodata
+
+        Parameters
+        ----------
+
+        - path: path of the output file
+        - typecode: array typecode of the values (default is 'f', 32 bits floats)
+        - nodata: value of the pixels of the tiles that failed (default is 0)
+        - geotiff: write a GeoTIFF file, a file of raw values otherwise (default is True)
+        - epsg: optional EPSG code of the CRS, for the GeoTIFF file
+        - geographic: True when the CRS is a geographic one, for the GeoTIFF file (default is False)
+        - ignore_errors: keep the tiles that failed to nodata, instead of raising the first error (default is False)
+
+        """
+
+        if geotiff:
+            writer = GeoTiffWriter(path, self.width, self.height, typecode, nodata, corner=self.corner,
+                                   pixelsize=self.pixelsize, epsg=epsg, geographic=geographic)
+        else:
+            writer = RawWriter(path, self.width, self.height, typecode, nodata)
+        try:
+            self.run(writer)
+        finally:
+            writer.close()
+        errors = self.errors()
+        if errors and not ignore_errors:
+            raise errors[0]['error']
+        return errors
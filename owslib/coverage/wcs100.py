@@ -14,6 +14,7 @@ from urllib import urlencode
 from owslib.util import openURL, testXMLValue
 from owslib.etree import etree
 from owslib.crs import Crs
+from owslib.coverage.tiling import CoverageTiles
 import os, errno
 
 #  function to save writing out WCS namespace in full each time
@@ -94,8 +95,11 @@ class WebCoverageService_1_0_0(WCSBase):
             sval = value
         return sval
   
-    def getCoverage(self, identifier=None, bbox=None, time=None, format = None,  crs=None, width=None, height=None, resx=None, resy=None, resz=None,parameter=None,method='Get',**kwargs):
+    def getCoverage(self, identifier=None, bbox=None, time=None, format = None,  crs=None, width=None, height=None, resx=None, resy=None, resz=None,parameter=None,method='Get', output=None, progress=None, resume=False, **kwargs):
         """Request and return a coverage from the WCS as a file-like object
+        or, when output is a file path, stream it to that file in chunks and return the size of the file in bytes:
+        progress is an optional function(bytes written, total bytes or None) called after each chunk,
+        resume=True completes a partial file with HTTP Range requests when the server supports them
         note: additional **kwargs helps with multi-version implementation
         core keyword arguments should be supported cross version
         example:
@@ -147,9 +151,23 @@ class WebCoverageService_1_0_0(WCSBase):
         self.log.debug('WCS 1.0.0 DEBUG: Second part of URL: %s'%data)
         
         
+        if output is not None:
+            return self.saveCoverage(base_url, data, method, output, progress, resume)
+
         u=openURL(base_url, data, method, self.cookies)
 
         return u
+
+    def getTiledCoverage(self, identifier, output, bbox=None, crs=None, format='GeoTIFF', tilesize=(512, 512), typecode='f', nodata=None, geotiff=True, epsg=None, geographic=False, maxConcurrent=4, ignore_errors=False, **kwargs):
+        """Request a coverage from the WCS as tiles aligned on its grid (the RectifiedGrid of DescribeCoverage),
+        fetched concurrently and written in place into a single GeoTIFF (or raw values) file, see owslib.coverage.tiling.
+        Returns the CoverageTiles, whose tiles keep the outcome of each request.
+        example:
+        tiles=wcs.getTiledCoverage('dem', 'dem.tif', bbox=(0,40,10,50), crs='EPSG:4326', format='GeoTIFF', tilesize=(1024,1024), epsg=4326, geographic=True)
+        """
+        tiles = CoverageTiles(self, identifier, bbox=bbox, crs=crs, format=format, tilesize=tilesize, maxConcurrent=maxConcurrent, **kwargs)
+        tiles.save(output, typecode=typecode, nodata=nodata, geotiff=geotiff, epsg=epsg, geographic=geographic, ignore_errors=ignore_errors)
+        return tiles
     
 
                
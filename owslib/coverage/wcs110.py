@@ -119,8 +119,11 @@ class WebCoverageService_1_1_0(WCSBase):
         #return filenames
     
     #TO DO: Handle rest of the  WCS 1.1.0 keyword parameters e.g. GridCRS etc. 
-    def getCoverage(self, identifier=None, bbox=None, time=None, format = None, store=False, rangesubset=None, gridbaseCRS=None, gridtype=None, gridCS=None, gridorigin=None, gridoffsets=None, method='Get',**kwargs):
+    def getCoverage(self, identifier=None, bbox=None, time=None, format = None, store=False, rangesubset=None, gridbaseCRS=None, gridtype=None, gridCS=None, gridorigin=None, gridoffsets=None, method='Get', output=None, progress=None, resume=False, **kwargs):
         """Request and return a coverage from the WCS as a file-like object
+        or, when output is a file path, stream it to that file in chunks and return the size of the file in bytes:
+        progress is an optional function(bytes written, total bytes or None) called after each chunk,
+        resume=True completes a partial file with HTTP Range requests when the server supports them
         note: additional **kwargs helps with multi-version implementation
         core keyword arguments should be supported cross version
         example:
@@ -176,6 +179,9 @@ class WebCoverageService_1_1_0(WCSBase):
         #encode and request
         data = urlencode(request)
         
+        if output is not None:
+            return self.saveCoverage(base_url, data, method, output, progress, resume)
+
         u=openURL(base_url, data, method, self.cookies)
         return u
         
@@ -10,9 +10,11 @@
 # =============================================================================
 
 from urllib import urlencode
-from urllib2 import urlopen, Request
+from urllib2 import urlopen, Request, HTTPError
 from owslib.etree import etree
+from owslib.util import download
 import cgi
+import os
 from StringIO import StringIO
 
 #!/usr/bin/env python
@@ -77,6 +79,69 @@ class WCSBase(object):
             self.log.setLevel(logging.ERROR)
         elif level=='CRITICAL':
             self.log.setLevel(logging.CRITICAL)
+
+    def saveCoverage(self, base_url, data, method, output, progress=None, resume=False, chunksize=65536):
+        ''' stream a GetCoverage response to the file output in chunks, without holding it in memory.
+        An interrupted or partial download is completed with HTTP Range requests when the server supports them.
+        Raises ServiceException, and removes the file, if the server answered with an exception report.
+        Returns the size of the file in bytes.
+
+        @type base_url: string
+        @param base_url: url of the GetCoverage operation
+        @type data: string
+        @param data: encoded request, appended to base_url for Get, the body of the request for Post
+        @type progress: callable
+        @param progress: optional function(bytes written, total bytes or None) called after each chunk
+        @type resume: bool
+        @param resume: complete an existing partial file instead of overwriting it
+        '''
+        if method.endswith('Post'):
+            url, body = base_url, data
+        else:
+            url = base_url.strip()
+            if url[-1] not in ['?', '&']:
+                url += url.find('?') == -1 and '?' or '&'
+            url, body = url + data, None
+        try:
+            size = download(url, output, chunksize=chunksize, resume=resume, progress=progress,
+                            data=body, cookies=self.cookies)
+        except HTTPError, e:
+            #some servers set the http status to 400 when returning an exception report
+            if e.code in [400, 401]:
+                xml = e.read()
+                raise ServiceException(_exceptionText(xml) or str(e), xml)
+            raise
+        #an exception report is small, only look at documents starting like one
+        f = open(output, 'rb')
+        try:
+            head = f.read(1024).lstrip()
+        finally:
+            f.close()
+        if head.startswith('<') and ('ExceptionReport' in head or 'ServiceException' in head):
+            f = open(output, 'rb')
+            try:
+                xml = f.read()
+            finally:
+                f.close()
+            message = _exceptionText(xml)
+            if message is not None:
+                os.remove(output)
+                raise ServiceException(message, xml)
+        return size
+
+def _exceptionText(xml):
+    ''' return the text of the exceptions of a ServiceExceptionReport / ExceptionReport, None if xml is not one '''
+    try:
+        root = etree.fromstring(xml)
+    except Exception:
+        return None
+    if root.tag.split('}')[-1] not in ['ServiceExceptionReport', 'ExceptionReport']:
+        return None
+    texts = []
+    for elem in root.iter():
+        if isinstance(elem.tag, basestring) and elem.tag.split('}')[-1] in ['ServiceException', 'ExceptionText']:
+            texts.append(' '.join(''.join(elem.itertext()).split()))
+    return '; '.join(texts)
         
 class WCSCapabilitiesReader(object):
     """Read and parses WCS capabilities document into a lxml.etree infoset
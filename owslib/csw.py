@@ -14,6 +14,7 @@ import StringIO
 import random
 from urllib import urlencode
 from urllib2 import urlopen
+from multiprocessing.pool import ThreadPool
 from owslib.etree import etree
 from owslib import fes
 from owslib import util
@@ -238,10 +239,16 @@ class CatalogueServiceWeb:
 
             self._parserecords(outputschema, esn)
 
-    def getrecordbyid(self, id=[], esn='full', outputschema=namespaces['csw'], format=outputformat):
+    def getrecordbyid(self, id=[], esn='full', outputschema=namespaces['csw'], format=outputformat, chunksize=50, maxurllength=2000, threads=4):
         """
 
-        Construct and process a GetRecordById request
+        Construct and process a GetRecordById request.  Long lists of
+        Ids are split into KVP GET requests, each filled with Ids up to
+        maxurllength characters and chunksize Ids, which are sent
+        concurrently and merged into self.records.  The Ids too long for
+        a GET URL of their own are sent in XML POST requests of at most
+        chunksize Ids.  The requested Ids missing from the responses are
+        listed in self.results['notfound'].
 
         Parameters
         ----------
@@ -250,10 +257,46 @@ class CatalogueServiceWeb:
         - esn: the ElementSetName 'full', 'brief' or 'summary' (default is 'full')
         - outputschema: the outputSchema (default is 'http://www.opengis.net/cat/csw/2.0.2')
         - format: the outputFormat (default is 'application/xml')
+        - chunksize: the maximum number of Ids per request (default is 50)
+        - maxurllength: the maximum length of a GET request URL (default is 2000)
+        - threads: the number of requests sent concurrently (default is 4)
 
         """
 
-        # construct request 
+        # drop duplicate Ids, keeping the requested order
+        ids = []
+        seen = set()
+        for i in id:
+            if i not in seen:
+                seen.add(i)
+                ids.append(i)
+
+        requests = self._getrecordbyidrequests(ids, esn, outputschema, format, chunksize, maxurllength)
+
+        if len(requests) > 1 and threads > 1:
+            pool = ThreadPool(min(threads, len(requests)))
+            try:
+                responses = pool.map(self._send, requests)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            responses = [self._send(r) for r in requests]
+
+        self.exceptionreport = None
+        self.results = {}
+        self.records = {}
+
+        for request, response, exml in responses:
+            self.request, self.response, self._exml = request, response, exml
+            self._parserecords(outputschema, esn)
+
+        self.results['returned'] = len(self.records)
+        self.results['notfound'] = [i for i in ids if i not in self.records]
+
+    def _getrecordbyidrequests(self, ids, esn, outputschema, format, chunksize=50, maxurllength=2000):
+        """ Return the GetRecordById requests (KVP URLs or POST Elements) covering a list of Ids """
+
         data = {
             'service': self.service,
             'version': self.version,
@@ -263,15 +306,48 @@ class CatalogueServiceWeb:
             'elementsetname': esn,
             'id': '',
         }
-
-        self.request = '%s%s%s' % (bind_url(self.url), urlencode(data), ','.join(id))
-
-        self._invoke()
- 
-        if self.exceptionreport is None:
-            self.results = {}
-            self.records = {}
-            self._parserecords(outputschema, esn)
+        base = '%s%s' % (bind_url(self.url), urlencode(data))
+
+        def post(chunk):
+            request = self._setrootelement('csw:GetRecordById')
+            request.set('service', self.service)
+            request.set('version', self.version)
+            request.set('outputSchema', outputschema)
+            request.set('outputFormat', format)
+            request.set(util.nspath_eval('xsi:schemaLocation', namespaces), schema_location)
+            for i in chunk:
+                etree.SubElement(request, util.nspath_eval('csw:Id', namespaces)).text = i
+            etree.SubElement(request, util.nspath_eval('csw:ElementSetName', namespaces)).text = esn
+            return request
+
+        if not ids:
+            return [base]
+
+        # fill each GET URL up to maxurllength, Ids too long for a GET of
+        # their own are POSTed, chunksize Ids at most per request either way
+        requests = []
+        chunk = []
+        posted = []
+        length = len(base)
+        for i in ids:
+            if len(base) + len(i) > maxurllength:
+                posted.append(i)
+                if len(posted) == chunksize:
+                    requests.append(post(posted))
+                    posted = []
+                continue
+            if chunk and (len(chunk) == chunksize or length + 1 + len(i) > maxurllength):
+                requests.append(base + ','.join(chunk))
+                chunk = []
+                length = len(base)
+            length += len(i) + (chunk and 1 or 0)
+            chunk.append(i)
+        if chunk:
+            requests.append(base + ','.join(chunk))
+        if posted:
+            requests.append(post(posted))
+
+        return requests
 
     def getrecords2(self, constraints=[], sortby=None, typenames='csw:Record', esn='summary', outputschema=namespaces['csw'], format=outputformat, startposition=0, maxrecords=10, cql=None, xml=None, resulttype='results'):
         """
@@ -565,17 +641,22 @@ class CatalogueServiceWeb:
     
     def _invoke(self):
         # do HTTP request
+        self.request, self.response, self._exml = self._send(self.request)
+        self.exceptionreport = None
+
+    def _send(self, request):
+        """ Send a GET (KVP string) or POST (etree Element) request and return the request, response and parsed response """
 
-        if isinstance(self.request, basestring):  # GET KVP
-            self.response = urlopen(self.request, timeout=self.timeout).read()
+        if isinstance(request, basestring):  # GET KVP
+            response = urlopen(request, timeout=self.timeout).read()
         else:
-            self.request = cleanup_namespaces(self.request)
-            self.request = util.xml2string(etree.tostring(self.request))
+            request = cleanup_namespaces(request)
+            request = util.xml2string(etree.tostring(request))
 
-            self.response = util.http_post(self.url, self.request, self.lang, self.timeout)
+            response = util.http_post(self.url, request, self.lang, self.timeout)
 
         # parse result see if it's XML
-        self._exml = etree.parse(StringIO.StringIO(self.response))
+        exml = etree.parse(StringIO.StringIO(response))
 
         # it's XML.  Attempt to decipher whether the XML response is CSW-ish """
         valid_xpaths = [
@@ -589,15 +670,15 @@ class CatalogueServiceWeb:
             util.nspath_eval('csw:TransactionResponse', namespaces)
         ]
 
-        if self._exml.getroot().tag not in valid_xpaths:
+        if exml.getroot().tag not in valid_xpaths:
             raise RuntimeError, 'Document is XML, but not CSW-ish'
 
         # check if it's an OGC Exception
-        val = self._exml.find(util.nspath_eval('ows:Exception', namespaces))
+        val = exml.find(util.nspath_eval('ows:Exception', namespaces))
         if val is not None:
-            raise ows.ExceptionReport(self._exml, self.owscommon.namespace)
-        else:
-            self.exceptionreport = None
+            raise ows.ExceptionReport(exml, self.owscommon.namespace)
+
+        return request, response, exml
 
 class CswRecord(object):
     """ Process csw:Record, csw:BriefRecord, csw:SummaryRecord """
@@ -0,0 +1,151 @@
+"""
+Declarative field-mapping engine for XML metadata parsers
+
+A FieldMap is a table of (attribute, path, converter, multiplicity) rows.
+The paths of a table are compiled once into a tree of element tags, so
+parsing an element walks its subtree a single time and fills every field
+of the table, instead of re-descending from the element for each
+find/findall call.
+
+    >>> from owslib.etree import etree
+    >>> doc = etree.fromstring('<a><b>1</b><c><d>x</d><d/><d>y</d></c></a>')
+    >>> fm = FieldMap([
+    ...     ('first', 'b'),
+    ...     ('items', 'c/d', text, MANY),
+    ...     ('every', 'c/d', text, ALL),
+    ...     ('missing', 'e'),
+    ...     ('either', ('e', 'b')),
+    ...     ('notset', 'e', text, OPTIONAL),
+    ... ])
+    >>> values = fm.parse(doc)
+    >>> sorted(values.items())
+    [('either', '1'), ('every', ['x', None, 'y']), ('first', '1'), ('items', ['x', 'y']), ('missing', None)]
+
+"""
+
+from owslib import util
+
+# multiplicity of a field
+ONE = 'one'  # first matching element, None if there is no match
+OPTIONAL = 'optional'  # first matching element, field not set if there is no match
+MANY = 'many'  # list of all matching elements, None values dropped
+ALL = 'all'  # list of all matching elements, None values kept
+
+
+def text(element):
+    """ converter: stripped element text """
+    return util.testXMLValue(element)
+
+
+def element(element):
+    """ converter: the element itself """
+    return element
+
+
+def attribute(name):
+    """ converter factory: value of attribute `name` of the element """
+    def convert(element):
+        return element.get(name)
+    return convert
+
+
+def compile_path(path, namespaces=None):
+    """ Return the tuple of element tags addressed by a prefixed path """
+    tags = []
+    for component in path.split('/'):
+        if namespaces is not None and component.find(':') != -1:
+            component = util.nspath_eval(component, namespaces)
+        tags.append(component)
+    return tuple(tags)
+
+
+class FieldMap(object):
+    """
+    Table of (attribute, path, converter, multiplicity) rows
+
+    - attribute: name of the resulting field
+    - path: ElementTree-style path relative to the parsed element, or a
+      tuple of alternative paths tried in order (the first one matching
+      any element wins)
+    - converter: callable applied to each matching element (default:
+      `text`)
+    - multiplicity: one of ONE, OPTIONAL, MANY, ALL (default: ONE)
+
+    """
+    def __init__(self, fields, namespaces=None):
+        self.fields = []
+        self._tree = {}
+
+        for index, row in enumerate(fields):
+            attr, paths = row[0], row[1]
+            converter = text
+            multiplicity = ONE
+            if len(row) > 2 and row[2] is not None:
+                converter = row[2]
+            if len(row) > 3:
+                multiplicity = row[3]
+            if multiplicity not in (ONE, OPTIONAL, MANY, ALL):
+                raise ValueError('Invalid multiplicity %r for field %s' % (multiplicity, attr))
+
+            if not isinstance(paths, (list, tuple)):
+                paths = (paths,)
+
+            for rank, path in enumerate(paths):
+                node = (None, self._tree)
+                for tag in compile_path(path, namespaces):
+                    node = node[1].setdefault(tag, ([], {}))
+                node[0].append((index, rank))
+
+            self.fields.append((attr, converter, multiplicity, len(paths)))
+
+    def _walk(self, element, tree, matches):
+        for child in element:
+            node = tree.get(child.tag)
+            if node is None:
+                continue
+            for key in node[0]:
+                matches[key].append(child)
+            if node[1]:
+                self._walk(child, node[1], matches)
+
+    def parse(self, element, target=None):
+        """
+        Walk `element` once and return a dict of field values.  When a
+        `target` object is given, the values are also set as attributes
+        of the target.
+        """
+        if hasattr(element, 'getroot'):  # standalone document
+            element = element.getroot()
+
+        matches = {}
+        for index, field in enumerate(self.fields):
+            for rank in range(field[3]):
+                matches[(index, rank)] = []
+
+        if element is not None:
+            self._walk(element, self._tree, matches)
+
+        values = {}
+        for index, (attr, converter, multiplicity, ranks) in enumerate(self.fields):
+            found = []
+            for rank in range(ranks):
+                found = matches[(index, rank)]
+                if found:
+                    break
+
+            if multiplicity in (ONE, OPTIONAL):
+                if found:
+                    values[attr] = converter(found[0])
+                elif multiplicity == ONE:
+                    values[attr] = None
+            else:
+                converted = [converter(e) for e in found]
+                if multiplicity == MANY:
+                    converted = [v for v in converted if v is not None]
+                values[attr] = converted
+
+        if target is not None:
+            for attr, value in values.iteritems():
+                setattr(target, attr, value)
+
+        return values
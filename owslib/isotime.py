@@ -0,0 +1,183 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Fast parsing of ISO 8601 timestamps
+
+dateutil.parser.parse accepts about any date format, at a high cost per
+call.  Service responses repeat the same layout thousands of times
+(e.g. '2009-06-12T10:47:54-07:00'), so parse() recognises strict ISO 8601
+timestamps with a regular expression once per layout, then reads the
+fields of the following timestamps of the same layout by position.
+Irregular strings still go through dateutil, and the results are the
+same: datetime objects with a dateutil tzutc / tzoffset time zone, or
+naive when the timestamp has none.
+
+    parse('2009-06-12T10:47:54.531250-07:00')
+    epoch('2009-06-12T17:47:54Z')                      # seconds since the epoch, UTC
+    epochs(['2009-06-12T17:47:54Z', ...])               # array of doubles
+    datetime64(['2009-06-12T17:47:54Z', ...])           # numpy datetime64[us] array, requires numpy
+"""
+
+import re
+import string
+import calendar
+from array import array
+from datetime import datetime
+
+from dateutil import parser
+from dateutil.tz import tzutc, tzoffset
+
+_ISO8601 = re.compile(r'^(\d{4})-(\d\d)-(\d\d)(?:[T ](\d\d):(\d\d)(?::(\d\d)(?:[.,](\d+))?)?)?(Z|[+-]\d\d(?::?\d\d)?)?$')
+
+_DIGITS = string.maketrans('0123456789', '0000000000')
+
+MAX_LAYOUTS = 256
+MAX_DAYS = 4096
+
+_layouts = {}  # layout (digits replaced by 0) -> field slices, or None when not ISO 8601
+_zones = {'Z': (tzutc(), 0)}  # offset -> (time zone, seconds east of UTC)
+_days = {}  # (year, month, day) -> seconds since the epoch of its midnight UTC
+
+
+def _zone(text):
+    """ Return the (cached) dateutil time zone and the number of seconds east of UTC of an ISO 8601 offset """
+    zone = _zones.get(text)
+    if zone is None:
+        seconds = int(text[1:3]) * 3600 + int(text[-2:] if len(text) > 3 else 0) * 60
+        if text[0] == '-':
+            seconds = -seconds
+        zone = _zones[text] = (seconds and tzoffset(None, seconds) or tzutc(), seconds)
+    return zone
+
+
+def _layout(text):
+    """ Return the field slices of the layout of text, None when it is not a strict ISO 8601 timestamp """
+    layout = text.translate(_DIGITS)
+    try:
+        return _layouts[layout]
+    except KeyError:
+        pass
+
+    m = _ISO8601.match(text)
+    slices = None
+    if m is not None:
+        slices = tuple(m.group(i) is not None and slice(*m.span(i)) or None for i in range(1, 9))
+    if len(_layouts) >= MAX_LAYOUTS:
+        _layouts.clear()
+    _layouts[layout] = slices
+    return slices
+
+
+def _fields(text):
+    """ Return (year, month, day, hour, minute, second, microsecond, zone) of a strict ISO 8601 timestamp, or None """
+    if isinstance(text, unicode):
+        try:
+            text = text.encode('ascii')
+        except UnicodeEncodeError:
+            return None
+    elif not isinstance(text, str):
+        return None
+    text = text.strip()
+    slices = _layout(text)
+    if slices is None:
+        return None
+    year, month, day, hour, minute, second, fraction, zone = slices
+    microsecond = 0
+    if fraction is not None:
+        microsecond = int((text[fraction] + '00000')[:6])
+    return (int(text[year]), int(text[month]), int(text[day]),
+            hour and int(text[hour]) or 0, minute and int(text[minute]) or 0,
+            second and int(text[second]) or 0, microsecond,
+            zone and text[zone] or None)
+
+
+def parse(text):
+    """
+
+    Parse a timestamp into a datetime, as dateutil.parser.parse does
+
+    Parameters
+    ----------
+
+    - text: the timestamp, ISO 8601 or any format understood by dateutil
+
+    """
+
+    fields = _fields(text)
+    if fields is None:
+        return parser.parse(text)
+    try:
+        tz = fields[7] and _zone(fields[7])[0] or None
+        return datetime(fields[0], fields[1], fields[2], fields[3], fields[4], fields[5], fields[6], tz)
+    except ValueError:  # e.g. 24:00:00, left to dateutil
+        return parser.parse(text)
+
+
+def _valid(fields):
+    try:
+        datetime(*fields[:7])
+        return True
+    except ValueError:
+        return False
+
+
+def epoch(text):
+    """ Return the number of seconds since the epoch of a timestamp (a float), naive timestamps are taken as UTC """
+    fields = _fields(text)
+    if fields is None or not ((1 <= fields[1] <= 12 and 1 <= fields[2] <= 28 and fields[3] < 24 and fields[4] < 60 and fields[5] < 60) or _valid(fields)):
+        dt = parser.parse(text)
+        return calendar.timegm(dt.utctimetuple()) + dt.microsecond / 1e6
+
+    year, month, day, hour, minute, second, microsecond, zone = fields
+    key = (year, month, day)
+    seconds = _days.get(key)
+    if seconds is None:
+        if len(_days) >= MAX_DAYS:
+            _days.clear()
+        seconds = _days[key] = calendar.timegm((year, month, day, 0, 0, 0))
+    seconds += hour * 3600 + minute * 60 + second
+    if zone is not None:
+        seconds -= _zone(zone)[1]
+    if microsecond:
+        return seconds + microsecond / 1e6
+    return float(seconds)
+
+
+def epochs(texts, missing=float('nan')):
+    """
+
+    Convert a sequence of timestamps to an array of doubles, seconds
+    since the epoch.  Consecutive identical timestamps are converted once.
+
+    Parameters
+    ----------
+
+    - texts: sequence of timestamps
+    - missing: the value of None or unparsable timestamps (default is NaN)
+
+    """
+
+    values = array('d')
+    last, seconds = None, missing
+    for text in texts:
+        if text != last:
+            last = text
+            try:
+                seconds = epoch(text)
+            except (AttributeError, TypeError, ValueError, OverflowError):
+                seconds = missing
+        values.append(seconds)
+    return values
+
+
+def datetime64(texts):
+    """ Convert a sequence of timestamps to a numpy datetime64[us] array (NaT when missing), requires numpy """
+    import numpy
+
+    seconds = numpy.frombuffer(epochs(texts), dtype='float64')
+    microseconds = numpy.round(seconds * 1e6)
+    result = numpy.empty(len(seconds), dtype='datetime64[us]')
+    valid = numpy.isfinite(microseconds)
+    result[valid] = microseconds[valid].astype('int64')
+    result[~valid] = numpy.datetime64('NaT')
+    return result
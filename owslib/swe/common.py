@@ -2,8 +2,11 @@ from owslib.util import nspath_eval
 from owslib.namespaces import Namespaces
 from owslib.util import testXMLAttribute, testXMLValue, InfiniteDateTime, NegativeInfiniteDateTime
 
-from dateutil import parser
+from owslib import isotime
 from datetime import timedelta
+from array import array
+from collections import OrderedDict
+import calendar
 
 from owslib.etree import etree
 
@@ -75,10 +78,11 @@ class NamedObject(object):
 
     # Revert to the type if attribute does not exists
     def __getattr__(self, name):
-        if hasattr(self, name):
-            return getattr(self, name)
-        else:
-            return getattr(self.content, name)
+        # only called when normal lookup fails, so look at the content directly
+        # (hasattr(self, name) would call __getattr__ again, without end)
+        if name == "content":
+            raise AttributeError(name)
+        return getattr(self.content, name)
 
 class AbstractSWE(object):
     def __init__(self, element):
@@ -248,9 +252,9 @@ class QuantityRange(Quantity):
 
 def get_time(value, referenceTime, uom):
     try:
-        value = parser.parse(value)
+        value = isotime.parse(value)
 
-    except (AttributeError, ValueError): # Most likely an integer/float using a referenceTime
+    except (AttributeError, TypeError, ValueError): # Most likely an integer/float using a referenceTime
         try:
             if uom.lower() == "s":
                 value  = referenceTime + timedelta(seconds=float(value))
@@ -261,7 +265,7 @@ def get_time(value, referenceTime, uom):
             elif uom.lower() == "d":
                 value  = referenceTime + timedelta(days=float(value))
         
-        except (AttributeError, ValueError):
+        except (AttributeError, TypeError, ValueError):
             pass
 
     except OverflowError: # Too many numbers (> 10) or INF/-INF
@@ -286,8 +290,8 @@ class Time(AbstractSimpleComponent):
         # Attributes
         self.localFrame         = testXMLAttribute(element,"localFrame")                                    # anyURI, optional
         try:
-            self.referenceTime  = parser.parse(testXMLAttribute(element,"referenceTime"))                   # dateTime, optional
-        except (AttributeError, ValueError):
+            self.referenceTime  = isotime.parse(testXMLAttribute(element,"referenceTime"))                   # dateTime, optional
+        except (AttributeError, TypeError, ValueError):
             self.referenceTime  = None
 
         value                   = testXMLValue(element.find(nspv("swe20:value")))                           # TimePosition, min=0, max=1
@@ -307,8 +311,8 @@ class TimeRange(AbstractSimpleComponent):
         # Attributes
         self.localFrame         = testXMLAttribute(element,"localFrame")                                # anyURI, optional
         try:
-            self.referenceTime  = parser.parse(testXMLAttribute(element,"referenceTime"))               # dateTime, optional
-        except (AttributeError, ValueError):
+            self.referenceTime  = isotime.parse(testXMLAttribute(element,"referenceTime"))               # dateTime, optional
+        except (AttributeError, TypeError, ValueError):
             self.referenceTime  = None
 
         values                  = make_pair(testXMLValue(element.find(nspv("swe20:value"))))            # TimePosition, min=0, max=1
@@ -363,6 +367,10 @@ class DataArray(AbstractDataComponent):
         self.encoding       = AbstractEncoding(element.find(nspv("swe20:encoding")))
         self.values         = testXMLValue(element.find(nspv("swe20:values")))
 
+    def decode(self):
+        """ Decode the values into typed columns, see decode_values """
+        return decode_values(self.elementType, self.encoding, self.values)
+
 class Matrix(AbstractDataComponent):
     def __init__(self, element):
         super(Matrix, self).__init__(element)
@@ -373,6 +381,10 @@ class Matrix(AbstractDataComponent):
         self.referenceFrame = testXMLAttribute(element, "referenceFrame")               # anyURI, required
         self.localFrame     = testXMLAttribute(element, "localFrame")                   # anyURI, optional
 
+    def decode(self):
+        """ Decode the values into typed columns, see decode_values """
+        return decode_values(self.elementType, self.encoding, self.values)
+
 class DataStream(AbstractSWEIdentifiable):
     def __init__(self, element):
         super(DataStream, self).__init__(element)
@@ -381,6 +393,10 @@ class DataStream(AbstractSWEIdentifiable):
         self.encoding       = AbstractEncoding(element.find(nspv("swe20:encoding")))
         self.values         = testXMLValue(element.find(nspv("swe20:values")))
 
+    def decode(self):
+        """ Decode the values into typed columns, see decode_values """
+        return decode_values(self.elementType, self.encoding, self.values)
+
 class ElementType(NamedObject):
     def __init__(self, element):
         super(ElementType, self).__init__(element)
@@ -408,4 +424,202 @@ class XMLEncoding(AbstractEncoding):
 
 class BinaryEncoding(AbstractEncoding):
     def __init__(self, element):
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+# Decoding of text encoded values
+
+# typecode of a 64-bit signed integer, 'l' is only 32 bits on some platforms
+INT64_TYPECODE = array('l').itemsize == 8 and 'l' or 'd'
+COUNT_MISSING = INT64_TYPECODE == 'l' and -2**63 or float('nan')  # Count column value of a missing or invalid token
+
+TIME_UNITS = {"ms": 0.001, "s": 1, "min": 60, "h": 3600, "d": 86400}
+
+class Categories(object):
+    """
+    Category column: one integer code per value, indexing the list of distinct categories (-1 when missing)
+    """
+    def __init__(self):
+        self.codes          = array('i')
+        self.categories     = []
+        self._index         = {}
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+
+    def code(self, value):
+        """ Return the code of a category, None when it does not occur """
+        return self._index.get(value)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        code = self.codes[i]
+        if code < 0:
+            return None
+        return self.categories[code]
+
+    def __iter__(self):
+        for i in xrange(len(self.codes)):
+            yield self[i]
+
+class _Leaf(object):
+    def __init__(self, path, component):
+        self.path           = path
+        self.component      = component
+        self.kind           = type(component).__name__
+        self.tokens         = []
+
+class _Choice(object):
+    def __init__(self, path, component):
+        self.path           = path
+        self.kind           = "Category"
+        self.component      = component
+        self.tokens         = []
+        self.items          = [(i.name, _structure(i.content, path[:-1] + [i.name])) for i in component.item]
+
+def _leaves(nodes):
+    for node in nodes:
+        yield node
+        if isinstance(node, _Choice):
+            for name, children in node.items:
+                for leaf in _leaves(children):
+                    yield leaf
+
+def _structure(component, path):
+    """ Flatten a data component into the list of nodes of its text encoding, in token order """
+    kind = type(component).__name__
+    if kind == "DataRecord":
+        return sum([_structure(f.content, path + [f.name]) for f in component.field], [])
+    elif kind == "Vector":
+        return sum([_structure(c.content, path + [c.name]) for c in component.coordinate], [])
+    elif kind == "DataChoice":
+        return [_Choice(path, component)]
+    elif kind in ["Boolean", "Count", "Quantity", "Time", "Category", "Text"]:
+        return [_Leaf(path, component)]
+    raise ValueError("Cannot decode text encoded %s components" % kind)
+
+def _walk(nodes, tokens, position):
+    """ Distribute the tokens of one block of a record holding DataChoice components, returns the next position """
+    for node in nodes:
+        token = tokens[position]
+        node.tokens.append(token)
+        position += 1
+        if isinstance(node, _Choice):
+            name = token.strip()
+            for item, children in node.items:
+                if item == name:
+                    position = _walk(children, tokens, position)
+                else:
+                    for leaf in _leaves(children):
+                        leaf.tokens.append(None)
+    return position
+
+def _floats(tokens, decimalSeparator):
+    if decimalSeparator != ".":
+        tokens = [t.replace(decimalSeparator, ".") if t is not None else None for t in tokens]
+    try:
+        return array('d', map(float, tokens))
+    except (TypeError, ValueError):  # missing or invalid values
+        values = array('d')
+        nan = float('nan')
+        for t in tokens:
+            value = get_float(t)
+            values.append(value if value is not None else nan)
+        return values
+
+def _times(tokens, component, decimalSeparator):
+    uom = component.uom or ""
+    factor = TIME_UNITS.get(uom.lower())
+    if factor is not None:
+        # numerical times, relative to the referenceTime (if any)
+        values = _floats(tokens, decimalSeparator)
+        origin = 0
+        if component.referenceTime is not None:
+            origin = calendar.timegm(component.referenceTime.utctimetuple())
+        if factor != 1 or origin != 0:
+            values = array('d', [origin + v * factor for v in values])
+        return values
+
+    values = isotime.epochs(tokens)
+    for i, t in enumerate(tokens):
+        if values[i] != values[i] and t is not None:  # NaN, maybe an infinite time
+            values[i] = {"inf": float('inf'), "+inf": float('inf'), "-inf": float('-inf')}.get(t.strip().lower(), values[i])
+    return values
+
+def _column(leaf, decimalSeparator):
+    tokens, kind = leaf.tokens, leaf.kind
+    if kind == "Quantity":
+        return _floats(tokens, decimalSeparator)
+    elif kind == "Time":
+        return _times(tokens, leaf.component, decimalSeparator)
+    elif kind == "Count":
+        values = array(INT64_TYPECODE)
+        for t in tokens:
+            value = get_int(t)
+            values.append(value if value is not None else COUNT_MISSING)
+        return values
+    elif kind == "Boolean":
+        values = array('b')
+        for t in tokens:
+            value = get_boolean(t.strip() if t is not None else None)
+            values.append(-1 if value is None else int(value))
+        return values
+    elif kind == "Category":
+        values = Categories()
+        for t in tokens:
+            values.append(t.strip() if t is not None else None)
+        return values
+    return [t.strip() if t is not None else None for t in tokens]
+
+def decode_values(elementType, encoding, values):
+    """
+    Decode the text encoded values of a DataArray, Matrix or DataStream into columns, returned as
+    an OrderedDict of field path (field names joined with '.') -> column, in encoding order:
+        Quantity: array of doubles (NaN when missing)
+        Count: array of 64-bit integers (COUNT_MISSING when missing)
+        Time: array of doubles, seconds since the epoch for ISO 8601 times and times relative to a
+              referenceTime, otherwise the numerical values as is (NaN when missing)
+        Boolean: array of bytes, 1, 0 or -1 when missing
+        Category: Categories object, the items chosen by a DataChoice are Category columns too
+        Text: list of strings (None when missing)
+    Blocks holding a DataChoice leave the fields of the items not chosen missing.
+    """
+    if not isinstance(encoding, TextEncoding):
+        raise ValueError("Only TextEncoding values can be decoded")
+
+    name = getattr(elementType, "name", None)
+    component = getattr(elementType, "content", elementType)
+    nodes = _structure(component, [name] if type(component).__name__ not in ["DataRecord", "Vector"] else [])
+    leaves = list(_leaves(nodes))
+
+    blocks = [b.strip() for b in (values or "").split(encoding.blockSeparator)]
+    blocks = [b for b in blocks if b]
+
+    if len(leaves) == len(nodes):
+        # fixed number of tokens per block: one split, then one slice per column
+        if encoding.tokenSeparator == encoding.blockSeparator:
+            tokens = blocks
+        else:
+            tokens = encoding.tokenSeparator.join(blocks).split(encoding.tokenSeparator) if blocks else []
+        if len(tokens) % len(leaves):
+            raise ValueError("%d values do not fill blocks of %d values" % (len(tokens), len(leaves)))
+        for i, leaf in enumerate(leaves):
+            leaf.tokens = tokens[i::len(leaves)]
+    else:
+        for block in blocks:
+            tokens = block.split(encoding.tokenSeparator)
+            if _walk(nodes, tokens, 0) != len(tokens):
+                raise ValueError("Unexpected number of values in block: %r" % block)
+
+    columns = OrderedDict()
+    for leaf in leaves:
+        columns[".".join(leaf.path)] = _column(leaf, encoding.decimalSeparator)
+    return columns
@@ -0,0 +1,207 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Concurrent GetObservation over long time ranges and many offerings
+
+Long eventTime ranges make SOS servers time out or truncate their
+responses, and many servers accept a single offering per request.
+ObservationFanout splits a request into time windows and groups of
+offerings, sends the requests concurrently (never more than the limit
+of the server at once, across all fan-outs of the process) and merges
+the decoded observations in time order, dropping the duplicates
+returned by consecutive windows sharing a bound:
+
+    columns = sos.get_observations(offerings=['station-44013', 'station-44018'],
+                                   observedProperties=['http://mmisw.org/ont/cf/parameter/winds'],
+                                   responseFormat='text/xml;subtype="om/1.0.0"',
+                                   begin='2012-01-01T00:00:00Z', end='2012-06-01T00:00:00Z',
+                                   window=timedelta(days=7), groupsize=1)
+
+"""
+
+import calendar
+import threading
+import time
+import urlparse
+from array import array
+from datetime import datetime, timedelta
+from multiprocessing.pool import ThreadPool
+
+from owslib import isotime
+from owslib.swe.observation.om import ObservationColumns, TIME_TYPECODE
+
+DEFAULT_SERVER_LIMIT = 4
+
+_servers = {}  # host -> BoundedSemaphore
+_servers_lock = threading.Lock()
+
+
+def set_server_limit(url, limit):
+    """ Set the maximum number of concurrent GetObservation requests sent to the host of url """
+    host = urlparse.urlparse(url).netloc
+    with _servers_lock:
+        _servers[host] = threading.BoundedSemaphore(limit)
+
+
+def _server(url):
+    host = urlparse.urlparse(url).netloc
+    with _servers_lock:
+        semaphore = _servers.get(host)
+        if semaphore is None:
+            semaphore = _servers[host] = threading.BoundedSemaphore(DEFAULT_SERVER_LIMIT)
+    return semaphore
+
+
+def _seconds(value):
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+    return isotime.epoch(value)
+
+
+def _seconds_delta(value):
+    if isinstance(value, timedelta):
+        return value.days * 86400 + value.seconds + value.microseconds / 1e6
+    return float(value)
+
+
+def windows(begin, end, window):
+    """
+
+    Split [begin, end] into consecutive windows, returns a list of
+    (begin, end) ISO 8601 UTC strings; consecutive windows share a bound
+
+    Parameters
+    ----------
+
+    - begin: datetime or ISO 8601 string
+    - end: datetime or ISO 8601 string
+    - window: timedelta or number of seconds, None for a single window
+
+    """
+
+    start, stop = _seconds(begin), _seconds(end)
+    if stop < start:
+        raise ValueError('end is before begin')
+    step = window is not None and _seconds_delta(window) or stop - start
+    if step <= 0:
+        step = stop - start
+
+    bounds = [start]
+    while bounds[-1] + step < stop:
+        bounds.append(bounds[-1] + step)
+    bounds.append(stop)
+    if len(bounds) > 2 and bounds[0] == bounds[1]:
+        bounds.pop(0)
+
+    iso = lambda t: time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(t))
+    return [(iso(a), iso(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def groups(items, size):
+    """ Split a list into consecutive lists of at most size items (all of them when size is None) """
+    if not size:
+        return [list(items)]
+    return [list(items[i:i + size]) for i in range(0, len(items), size)]
+
+
+class ObservationFanout(object):
+    """ GetObservation requests of one query, split by time window and group of offerings """
+    def __init__(self, service, offerings, observedProperties, begin, end, responseFormat=None,
+                 window=timedelta(days=7), groupsize=None, maxConcurrent=4, method='Get', properties=None, **kwargs):
+        """
+
+        Plan the requests
+
+        Parameters
+        ----------
+
+        - service: a SensorObservationService (1.0.0 or 2.0.0)
+        - offerings: list of offering names
+        - observedProperties: list of observed properties
+        - begin: datetime or ISO 8601 string
+        - end: datetime or ISO 8601 string
+        - responseFormat: the response format (O&M)
+        - window: maximum duration of the time window of a request, timedelta or seconds (default is 7 days)
+        - groupsize: maximum number of offerings per request (default is all of them)
+        - maxConcurrent: maximum number of requests in progress at once (default is 4)
+        - method: HTTP DCP method name, Get or Post (default is Get)
+        - properties: optional list of observed properties to keep in the decoded observations
+        - kwargs: anything else, e.g. vendor specific parameters
+
+        """
+
+        self.service = service
+        self.observedProperties = observedProperties
+        self.responseFormat = responseFormat
+        self.maxConcurrent = maxConcurrent
+        self.method = method
+        self.properties = properties
+        self.kwargs = kwargs
+        self.requests = [{'offerings': group, 'begin': b, 'end': e, 'observations': None, 'error': None, 'elapsed': None}
+                         for group in groups(offerings, groupsize) for b, e in windows(begin, end, window)]
+
+    def _get(self, request):
+        url = self.service.get_operation_by_name('GetObservation').methods[self.method]['url']
+        server = _server(url)
+        server.acquire()
+        start = time.time()
+        try:
+            columns = self.service.get_observation_columns(responseFormat=self.responseFormat,
+                offerings=request['offerings'], observedProperties=self.observedProperties,
+                eventTime=self.service._event_time(request['begin'], request['end']),
+                method=self.method, properties=self.properties, **self.kwargs)
+            request['observations'] = len(columns)
+            return columns
+        except Exception, err:
+            request['error'] = err
+            return None
+        finally:
+            request['elapsed'] = time.time() - start
+            server.release()
+
+    def run(self):
+        """ Send the requests and return the merged ObservationColumns, the outcome of each request is kept in self.requests """
+        if len(self.requests) > 1 and self.maxConcurrent > 1:
+            pool = ThreadPool(min(self.maxConcurrent, len(self.requests)))
+            try:
+                results = pool.map(self._get, self.requests)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [self._get(request) for request in self.requests]
+        return merge([columns for columns in results if columns is not None])
+
+    def errors(self):
+        """ Return the requests that failed """
+        return [request for request in self.requests if request['error'] is not None]
+
+
+def merge(columns):
+    """ Merge ObservationColumns in time order, keeping one row per (time, station, property) """
+    merged = ObservationColumns()
+    times, values = array(TIME_TYPECODE), array('d')
+    station_index, property_index = array('i'), array('i')
+    for c in columns:
+        # indexes of the stations and properties of c in merged
+        stations = [merged.station(station) for station in c.stations]
+        properties = [merged.property(property) for property in c.properties]
+        merged.units.update(c.units)
+        times.extend(c.times)
+        values.extend(c.values)
+        station_index.extend(stations[s] for s in c.station_index)
+        property_index.extend(properties[p] for p in c.property_index)
+
+    # stable order of the rows by time, the rows of a time are deduplicated on station and property
+    nproperties = len(merged.properties)
+    last, seen = None, set()
+    for i in sorted(xrange(len(times)), key=times.__getitem__):
+        if times[i] != last:
+            last = times[i]
+            seen.clear()
+        key = station_index[i] * nproperties + property_index[i]
+        if key in seen:
+            continue
+        seen.add(key)
+        merged.append(times[i], station_index[i], property_index[i], values[i])
+    return merged
@@ -0,0 +1,195 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+In-memory index of the observation offerings of a SOS capabilities document
+
+Large SOS servers (e.g. NDBC) advertise thousands of offerings.
+OfferingIndex is built once from the offerings of a
+SensorObservationService and answers queries by observed property,
+procedure, feature of interest, bounding box and time window without
+scanning them:
+
+    sos = SensorObservationService(url)
+    offerings = sos.query_offerings(observed_property='http://mmisw.org/ont/cf/parameter/winds',
+                                    bbox=(-80, 25, -60, 45), begin='2012-01-01T00:00:00Z')
+
+"""
+
+import calendar
+import math
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from owslib import isotime
+
+INFINITY = float('inf')
+
+MAX_CELLS = 1024  # cells of a bbox beyond which it is scanned instead
+
+
+def _epoch(value, default):
+    """ Seconds since the epoch of a datetime, ISO 8601 string or number, naive times are taken as UTC """
+    if value is None:
+        return default
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+    if isinstance(value, basestring):
+        return isotime.epoch(value)
+    if isinstance(value, (int, long, float)):
+        return float(value)
+    return default  # e.g. InfiniteDateTime
+
+
+class OfferingIndex(object):
+    """ Inverted, spatial and temporal index of SosObservationOffering objects """
+    def __init__(self, offerings, cellsize=None):
+        """
+
+        Build an offering index
+
+        Parameters
+        ----------
+
+        - offerings: list of SosObservationOffering objects (SOS 1.0.0 or 2.0.0)
+        - cellsize: size of the bbox grid cells, in bbox_srs units (default follows the
+          extent and the number of the offering bboxes, about one bbox per cell)
+
+        """
+
+        self.offerings = list(offerings)
+        self._values = {'observed_properties': {}, 'procedures': {}, 'features_of_interest': {}}  # attribute -> value -> set of positions
+        self._cells = {}  # (col, row) -> set of positions
+        self._bboxes = {}  # position -> bbox
+        self._large = set()  # positions of the bboxes over more than MAX_CELLS cells, always tested
+
+        begins, ends = [], []
+        for position, offering in enumerate(self.offerings):
+            for attribute, values in self._values.iteritems():
+                for value in getattr(offering, attribute, None) or []:
+                    values.setdefault(value, set()).add(position)
+
+            bbox = getattr(offering, 'bbox', None)
+            if bbox is not None:
+                self._bboxes[position] = bbox
+
+            begins.append((_epoch(getattr(offering, 'begin_position', None), -INFINITY), position))
+            ends.append((_epoch(getattr(offering, 'end_position', None), INFINITY), position))
+
+        self._begins = sorted(begins)
+        self._ends = sorted(ends)
+
+        if cellsize is None:
+            cellsize = self._cellsize()
+        self.cellsize = cellsize
+        for position, bbox in self._bboxes.iteritems():
+            cells = self._bboxcells(bbox)
+            if cells is None:
+                self._large.add(position)
+                continue
+            for cell in cells:
+                self._cells.setdefault(cell, set()).add(position)
+
+    def _cellsize(self):
+        """ Cell size of about one bbox per cell over the extent of the finite bboxes """
+        finite = [b for b in self._bboxes.itervalues() if all(abs(v) < INFINITY for v in b)]
+        if not finite:
+            return 1.0
+        width = max(b[2] for b in finite) - min(b[0] for b in finite)
+        height = max(b[3] for b in finite) - min(b[1] for b in finite)
+        if width <= 0 and height <= 0:
+            return 1.0
+        if width <= 0 or height <= 0:
+            return max(width, height) / len(finite)
+        return math.sqrt(width * height / len(finite))
+
+    def __len__(self):
+        return len(self.offerings)
+
+    def _bboxcells(self, bbox):
+        """ Cells of bbox, None when there are more than MAX_CELLS of them """
+        minx, miny, maxx, maxy = bbox
+        size = self.cellsize
+        if not all(abs(v) < INFINITY for v in bbox) or \
+                ((maxx - minx) / size + 1) * ((maxy - miny) / size + 1) > MAX_CELLS:
+            return None
+        return [(col, row) for col in xrange(int(minx // size), int(maxx // size) + 1)
+                for row in xrange(int(miny // size), int(maxy // size) + 1)]
+
+    def _lookup(self, attribute, values):
+        if isinstance(values, basestring):
+            values = [values]
+        positions = set()
+        index = self._values[attribute]
+        for value in values:
+            positions.update(index.get(value, ()))
+        return positions
+
+    def _intersects(self, bbox):
+        minx, miny, maxx, maxy = bbox
+        cells = self._bboxcells(bbox)
+        if cells is None:  # too large a query, scan the bboxes
+            positions = self._bboxes.keys()
+        else:
+            positions = set(self._large)
+            for cell in cells:
+                positions.update(self._cells.get(cell, ()))
+        result = set()
+        for position in positions:
+            left, bottom, right, top = self._bboxes[position]
+            if left <= maxx and right >= minx and bottom <= maxy and top >= miny:
+                result.add(position)
+        return result
+
+    def _during(self, begin, end):
+        """ Positions of the offerings whose time period overlaps [begin, end] """
+        result = None
+        if end < INFINITY:  # offerings beginning before the end of the window
+            result = set(p for t, p in self._begins[:bisect_right(self._begins, (end, len(self.offerings)))])
+        if begin > -INFINITY:  # offerings ending after the beginning of the window
+            ending = set(p for t, p in self._ends[bisect_left(self._ends, (begin, -1)):])
+            result = ending if result is None else result & ending
+        return result
+
+    def query(self, observed_property=None, procedure=None, feature_of_interest=None, bbox=None, begin=None, end=None):
+        """
+
+        Return the offerings matching all the given criteria, in
+        capabilities order
+
+        Parameters
+        ----------
+
+        - observed_property: observed property URI, or list of URIs (any of)
+        - procedure: procedure URI, or list of URIs (any of)
+        - feature_of_interest: feature of interest URI, or list of URIs (any of)
+        - bbox: (minx, miny, maxx, maxy) the offering bounding box must intersect, in bbox_srs units
+        - begin: datetime, ISO 8601 string or seconds since the epoch, the offering time period must end after it
+        - end: datetime, ISO 8601 string or seconds since the epoch, the offering time period must begin before it
+
+        """
+
+        candidates = []
+        for attribute, values in [('observed_properties', observed_property), ('procedures', procedure),
+                                  ('features_of_interest', feature_of_interest)]:
+            if values is not None:
+                candidates.append(self._lookup(attribute, values))
+        if begin is not None or end is not None:
+            during = self._during(_epoch(begin, -INFINITY), _epoch(end, INFINITY))
+            if during is not None:  # else an unbounded window
+                candidates.append(during)
+
+        # the spatial test is the most expensive, run it last on the smallest candidate set
+        candidates.sort(key=len)
+        if candidates:
+            result = candidates[0].intersection(*candidates[1:])
+        else:
+            result = set(range(len(self.offerings)))
+        if bbox is not None:
+            if len(result) < len(self._bboxes) / 4:
+                minx, miny, maxx, maxy = bbox
+                result = set(p for p in result if p in self._bboxes and self._bboxes[p][0] <= maxx and
+                             self._bboxes[p][2] >= minx and self._bboxes[p][1] <= maxy and self._bboxes[p][3] >= miny)
+            else:
+                result &= self._intersects(bbox)
+
+        return [self.offerings[p] for p in sorted(result)]
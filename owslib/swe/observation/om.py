@@ -0,0 +1,319 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Streaming parser of O&M GetObservation responses
+
+parse_observations() reads an O&M 1.0 ObservationCollection or an O&M 2.0
+GetObservationResponse incrementally (iterparse) and decodes the
+swe:DataArray results, and the single value (MeasureType) results, into
+columns: one row per (time, station, property, value).  Each observation
+is discarded once decoded, so the memory used is bounded by the
+columns, not by the size of the XML document:
+
+    columns = sos.get_observation_columns(offerings=[...], ...)  # or parse_observations(filename)
+    for time, station, property, value in columns.rows():
+        ...
+
+The columns are array.array objects: times in seconds since the epoch
+(64-bit integers), values as 64-bit floats, and station / property
+indexes into the stations and properties lists.  They expose the buffer
+interface, e.g. numpy.frombuffer(columns.values) does not copy them.
+"""
+
+import math
+from array import array
+from StringIO import StringIO
+
+from owslib import ows, isotime
+from owslib.etree import etree
+
+# typecode of a 64-bit signed integer, 'l' is only 32 bits on some platforms
+TIME_TYPECODE = array('l').itemsize == 8 and 'l' or 'd'
+
+LEAVES = ['Time', 'Quantity', 'Count', 'Text', 'Category', 'Boolean']
+VALUES = ['Quantity', 'Count']
+STATION_FIELDS = ['station', 'station_id', 'stationid', 'procedure', 'sensor', 'sensor_id', 'platform']
+LOCATION_FIELDS = ['latitude', 'longitude', 'lat', 'lon']
+
+
+def _localname(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _href(element):
+    return element.get('{http://www.w3.org/1999/xlink}href')
+
+
+def epoch(text):
+    """ Return the number of seconds since the epoch of an ISO 8601 time, truncated to the second """
+    return int(math.floor(isotime.epoch(text)))
+
+
+class ObservationColumns(object):
+    """ Columnar observations: times, values, station and property indexes """
+    def __init__(self):
+        self.times = array(TIME_TYPECODE)
+        self.values = array('d')
+        self.station_index = array('i')
+        self.property_index = array('i')
+        self.stations = []
+        self.properties = []
+        self.units = {}  # property -> unit of measure
+        self._stations = {}
+        self._properties = {}
+
+    def __len__(self):
+        return len(self.times)
+
+    def station(self, key):
+        """ Return the index of a station, adding it if needed """
+        index = self._stations.get(key)
+        if index is None:
+            index = self._stations[key] = len(self.stations)
+            self.stations.append(key)
+        return index
+
+    def property(self, key, uom=None):
+        """ Return the index of an observed property, adding it if needed """
+        index = self._properties.get(key)
+        if index is None:
+            index = self._properties[key] = len(self.properties)
+            self.properties.append(key)
+        if uom is not None:
+            self.units[key] = uom
+        return index
+
+    def append(self, time, station, property, value):
+        """ Append one row, given the station and property indexes """
+        self.times.append(time)
+        self.station_index.append(station)
+        self.property_index.append(property)
+        self.values.append(value)
+
+    def rows(self):
+        """ Iterate over the (time, station, property, value) rows """
+        stations, properties = self.stations, self.properties
+        for time, s, p, value in zip(self.times, self.station_index, self.property_index, self.values):
+            yield time, stations[s], properties[p], value
+
+    def series(self, station, property):
+        """ Return the (times, values) arrays of one station and property, in document order """
+        times, values = array(TIME_TYPECODE), array('d')
+        s, p = self._stations.get(station), self._properties.get(property)
+        if s is None or p is None:
+            return times, values
+        for i in xrange(len(self.times)):
+            if self.station_index[i] == s and self.property_index[i] == p:
+                times.append(self.times[i])
+                values.append(self.values[i])
+        return times, values
+
+
+class _Field(object):
+    """ A scalar component of a swe:DataRecord """
+    def __init__(self, element, name):
+        self.kind = _localname(element.tag)
+        self.name = name
+        self.definition = element.get('definition')
+        self.uom = None
+        for child in element:
+            if _localname(child.tag) == 'uom':
+                self.uom = child.get('code') or _href(child)
+
+    def key(self):
+        return self.definition or self.name
+
+
+def _fields(element, name=None, vector=False):
+    """ Flatten the scalar components of a swe:DataRecord, in encoding order """
+    fields = []
+    for child in element:
+        tag = _localname(child.tag)
+        if tag in ['field', 'coordinate', 'elementType']:
+            fields.extend(_fields(child, child.get('name'), vector or tag == 'coordinate'))
+        elif tag in LEAVES:
+            field = _Field(child, name)
+            field.location = vector or (name or '').lower() in LOCATION_FIELDS
+            fields.append(field)
+        elif tag in ['DataRecord', 'Vector', 'SimpleDataRecord']:
+            fields.extend(_fields(child, name, vector or tag == 'Vector'))
+    return fields
+
+
+class ObservationParser(object):
+    """ Incremental decoder of the observations of a GetObservation response """
+    def __init__(self, columns=None, properties=None):
+        """
+
+        Parameters
+        ----------
+
+        - columns: optional ObservationColumns to append to
+        - properties: optional list of observed properties (definition or field name) to keep, the others are skipped
+
+        """
+
+        if columns is None:
+            columns = ObservationColumns()
+        self.columns = columns
+        self.properties = properties
+
+    def parse(self, source):
+        """ Decode the observations of source (file name, file object or XML string), returns the ObservationColumns """
+        if isinstance(source, basestring) and source.lstrip().startswith('<'):
+            source = StringIO(source)
+
+        observation = None
+        fields = None
+        separators = [',', '\n', '.']
+        root = None
+
+        options = {}
+        if hasattr(etree, 'LXML_VERSION'):
+            options['huge_tree'] = True  # a year of values for many stations exceeds the default 10MB text limit
+
+        for event, element in etree.iterparse(source, events=('start', 'end'), **options):
+            tag = _localname(element.tag)
+            if event == 'start':
+                if root is None:
+                    root = element
+                if tag in ['Observation', 'OM_Observation']:
+                    observation = {'procedure': None, 'property': None, 'feature': None, 'time': None}
+                    fields = None
+                continue
+
+            if tag == 'ExceptionReport' and element is root:
+                raise ows.ExceptionReport(element)
+
+            if observation is None:
+                continue
+
+            if tag == 'procedure':
+                observation['procedure'] = _href(element) or (element.text or '').strip() or None
+            elif tag == 'observedProperty':
+                observation['property'] = _href(element) or (element.text or '').strip() or None
+            elif tag == 'featureOfInterest':
+                observation['feature'] = _href(element)
+            elif tag == 'timePosition':
+                if observation['time'] is None:
+                    observation['time'] = element.text
+            elif tag == 'elementType':
+                fields = _fields(element)
+            elif tag in ['TextBlock', 'TextEncoding']:
+                separators = [element.get('tokenSeparator', ','), element.get('blockSeparator', '\n'),
+                              element.get('decimalSeparator', '.')]
+            elif tag == 'values':
+                if fields is not None and element.text:
+                    self._decode(observation, fields, separators, element.text)
+                element.clear()
+            elif tag == 'result':
+                if len(element) == 0 and element.text and element.text.strip():
+                    self._measure(observation, element)
+            elif tag in ['Observation', 'OM_Observation']:
+                observation = None
+                fields = None
+                element.clear()
+                # drop the observations already decoded, not only their content
+                if hasattr(element, 'getprevious'):
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+
+        return self.columns
+
+    def _station(self, observation):
+        return observation['procedure'] or observation['feature']
+
+    def _keep(self, field):
+        if self.properties is None:
+            return True
+        return field.definition in self.properties or field.name in self.properties
+
+    def _measure(self, observation, element):
+        """ A single value result, i.e. om:result of type gml:MeasureType """
+        if observation['time'] is None or (self.properties is not None and observation['property'] not in self.properties):
+            return
+        try:
+            value = float(element.text)
+        except ValueError:
+            return
+        columns = self.columns
+        columns.append(epoch(observation['time']), columns.station(self._station(observation)),
+                       columns.property(observation['property'], element.get('uom')), value)
+
+    def _decode(self, observation, fields, separators, text):
+        """ Decode the text encoded values of a swe:DataArray """
+        columns = self.columns
+        token, block, decimal = separators
+
+        timefield = None
+        stationfield = None
+        values = []
+        for i, field in enumerate(fields):
+            if field.kind == 'Time' and timefield is None:
+                timefield = i
+            elif field.kind in ['Text', 'Category'] and stationfield is None and (field.name or '').lower() in STATION_FIELDS:
+                stationfield = i
+            elif field.kind in VALUES and not field.location and self._keep(field):
+                values.append((i, columns.property(field.key(), field.uom)))
+        if timefield is None or not values:
+            return
+
+        if stationfield is None:
+            station = columns.station(self._station(observation))
+        stations = {}
+        count = len(fields)
+        nan = float('nan')
+        times_append = columns.times.append
+        values_append = columns.values.append
+        station_append = columns.station_index.append
+        property_append = columns.property_index.append
+        lasttime, lastepoch = None, None
+
+        for record in text.split(block):
+            record = record.strip()
+            if not record:
+                continue
+            tokens = record.split(token)
+            if len(tokens) != count:
+                raise ValueError('Expected %d values per block, got %d: %r' % (count, len(tokens), record))
+
+            if tokens[timefield] != lasttime:  # consecutive rows of different properties share their time
+                lasttime = tokens[timefield]
+                lastepoch = epoch(lasttime)
+            if stationfield is not None:
+                key = tokens[stationfield]
+                s = stations.get(key)
+                if s is None:
+                    s = stations[key] = columns.station(key)
+            else:
+                s = station
+
+            for i, p in values:
+                value = tokens[i].strip()
+                if decimal != '.':
+                    value = value.replace(decimal, '.')
+                try:
+                    value = float(value)
+                except ValueError:
+                    value = nan
+                times_append(lastepoch)
+                station_append(s)
+                property_append(p)
+                values_append(value)
+
+
+def parse_observations(source, properties=None):
+    """
+
+    Decode the observations of a GetObservation response into
+    ObservationColumns
+
+    Parameters
+    ----------
+
+    - source: file name, file object or XML string of the response
+    - properties: optional list of observed properties (definition or field name) to keep
+
+    """
+
+    return ObservationParser(properties=properties).parse(source)
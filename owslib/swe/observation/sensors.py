@@ -0,0 +1,72 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Concurrent DescribeSensor requests, shared by the SOS 1.0.0 and 2.0.0 services
+
+SensorDescriptions is mixed into the SensorObservationService classes,
+which provide describe_sensor and a _sensors dict caching the parsed
+descriptions by (procedure, outputFormat):
+
+    systems = sos.describe_sensors(outputFormat='text/xml;subtype="sensorML/1.0.1"',
+                                   procedures=['urn:ioos:station:wmo:41012', 'urn:ioos:station:wmo:44013'])
+
+"""
+
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+from owslib.swe.sensor.sml import system_metadata
+
+
+class SensorDescriptions(object):
+    """ describe_sensors of a SensorObservationService """
+    def describe_sensors(self, outputFormat=None,
+                         procedures=None,
+                         method='Get',
+                         maxConcurrent=4,
+                         ignore_errors=False,
+                         **kwargs):
+        """
+        Describe several procedures concurrently, return an OrderedDict
+        of procedure -> SystemMetadata (see owslib.swe.sensor.sml), in
+        the order of procedures.  The descriptions are parsed once and
+        cached by (procedure, outputFormat), only the procedures not
+        described yet are requested.
+
+        Parameters are those of describe_sensor, plus
+        procedures : list
+            Procedure URIs
+        maxConcurrent : int
+            Optional. Maximum number of requests in progress at once (default is 4)
+        ignore_errors : bool
+            Optional. Leave out the procedures whose description failed,
+            instead of raising the first error
+        """
+        missing = set(procedure for procedure in procedures if (procedure, outputFormat) not in self._sensors)
+
+        def describe(procedure):
+            try:
+                response = self.describe_sensor(outputFormat=outputFormat, procedure=procedure, method=method, **kwargs)
+                self._sensors[(procedure, outputFormat)] = system_metadata(response)
+            except Exception, err:
+                return err
+
+        if len(missing) > 1 and maxConcurrent > 1:
+            pool = ThreadPool(min(maxConcurrent, len(missing)))
+            try:
+                errors = pool.map(describe, missing)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            errors = [describe(procedure) for procedure in missing]
+
+        errors = [err for err in errors if err is not None]
+        if errors and not ignore_errors:
+            raise errors[0]
+
+        result = OrderedDict()
+        for procedure in procedures:
+            if (procedure, outputFormat) in self._sensors:
+                result[procedure] = self._sensors[(procedure, outputFormat)]
+        return result
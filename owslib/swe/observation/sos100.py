@@ -1,12 +1,16 @@
 import cgi
 from owslib.etree import etree
-from datetime import datetime
+from datetime import datetime, timedelta
 from urllib import urlencode
 from owslib import ows
 from owslib.crs import Crs
 from owslib.fes import FilterCapabilities
 from owslib.util import openURL, testXMLValue, nspath_eval, nspath, extract_time
 from owslib.namespaces import Namespaces
+from owslib.swe.observation.om import parse_observations
+from owslib.swe.observation.index import OfferingIndex
+from owslib.swe.observation.fanout import ObservationFanout
+from owslib.swe.observation.sensors import SensorDescriptions
 
 def get_namespaces():
     n = Namespaces()
@@ -15,7 +19,7 @@ def get_namespaces():
     return ns
 namespaces = get_namespaces()
 
-class SensorObservationService_1_0_0(object):
+class SensorObservationService_1_0_0(SensorDescriptions):
     """
         Abstraction for OGC Sensor Observation Service (SOS).
 
@@ -91,6 +95,31 @@ class SensorObservationService_1_0_0(object):
             off = SosObservationOffering(offering)
             self.contents[off.id] = off
             self.offerings.append(off)
+        self._offering_index = None
+        self._sensors = {}  # (procedure, outputFormat) -> SystemMetadata
+
+    def query_offerings(self, observed_property=None,
+                              procedure=None,
+                              feature_of_interest=None,
+                              bbox=None,
+                              begin=None,
+                              end=None):
+        """
+        Return the offerings matching all the given criteria, using an
+        index of the offerings built on first use (see OfferingIndex.query)
+
+        Parameters
+        ----------
+        observed_property, procedure, feature_of_interest : string or list
+            Optional. URIs, an offering matches if it lists any of them
+        bbox : tuple
+            Optional. (minx, miny, maxx, maxy) the offering bounding box must intersect
+        begin, end : datetime, string or number
+            Optional. Time window the offering time period must overlap (ISO 8601 or seconds since the epoch)
+        """
+        if self._offering_index is None:
+            self._offering_index = OfferingIndex(self.offerings)
+        return self._offering_index.query(observed_property, procedure, feature_of_interest, bbox, begin, end)
 
     def describe_sensor(self,   outputFormat=None,
                                 procedure=None,
@@ -139,6 +168,88 @@ class SensorObservationService_1_0_0(object):
             anything else e.g. vendor specific parameters
         """
 
+        response = self._open_observation(responseFormat, offerings, observedProperties, eventTime, method, **kwargs).read()
+        try:
+            tr = etree.fromstring(response)
+            if tr.tag == nspath_eval("ows:ExceptionReport", namespaces):
+                raise ows.ExceptionReport(tr)
+        except ows.ExceptionReport:
+            raise
+        except BaseException:
+            return response
+
+    def get_observation_columns(self, responseFormat=None,
+                                      offerings=None,
+                                      observedProperties=None,
+                                      eventTime=None,
+                                      method='Get',
+                                      properties=None,
+                                      **kwargs):
+        """
+        Stream a GetObservation response through the O&M parser, and
+        return the observations as ObservationColumns (see owslib.swe.observation.om)
+
+        Parameters are those of get_observation, plus
+        properties : list
+            Optional. Observed properties (definition or field name) to keep, the others are skipped
+        """
+
+        response = self._open_observation(responseFormat, offerings, observedProperties, eventTime, method, **kwargs)
+        try:
+            return parse_observations(response, properties)
+        finally:
+            response.close()
+
+    def get_observations(self, responseFormat=None,
+                         offerings=None,
+                         observedProperties=None,
+                         begin=None,
+                         end=None,
+                         window=timedelta(days=7),
+                         groupsize=None,
+                         maxConcurrent=4,
+                         method='Get',
+                         properties=None,
+                         ignore_errors=False,
+                         **kwargs):
+        """
+        Split a GetObservation request into time windows and groups of
+        offerings, send the requests concurrently and return the merged
+        ObservationColumns, in time order and without duplicates
+        (see owslib.swe.observation.fanout)
+
+        Parameters are those of get_observation_columns, plus
+        begin, end : datetime or string
+            Time range of the observations
+        window : timedelta or number
+            Optional. Maximum duration of the time window of one request (default is 7 days)
+        groupsize : int
+            Optional. Maximum number of offerings per request (default is all of them)
+        maxConcurrent : int
+            Optional. Maximum number of requests in progress at once, the
+            limit of the server (fanout.set_server_limit) applies as well
+        ignore_errors : bool
+            Optional. Return the observations of the successful requests
+            when some fail, instead of raising the first error
+        """
+        fanout = ObservationFanout(self, offerings, observedProperties, begin, end, responseFormat, window,
+                                   groupsize, maxConcurrent, method, properties, **kwargs)
+        columns = fanout.run()
+        errors = fanout.errors()
+        if errors and not ignore_errors:
+            raise errors[0]['error']
+        return columns
+
+    def _event_time(self, begin, end):
+        """
+            Format the time range of a GetObservation request
+        """
+        return '%s/%s' % (begin, end)
+
+    def _open_observation(self, responseFormat, offerings, observedProperties, eventTime, method, **kwargs):
+        """
+            Send a GetObservation request, return the response stream
+        """
         base_url = self.get_operation_by_name('GetObservation').methods[method]['url']        
         request = {'service': 'SOS', 'version': self.version, 'request': 'GetObservation'}
 
@@ -163,15 +274,7 @@ class SensorObservationService_1_0_0(object):
 
         data = urlencode(request)        
 
-        response = openURL(base_url, data, method, username=self.username, password=self.password).read()
-        try:
-            tr = etree.fromstring(response)
-            if tr.tag == nspath_eval("ows:ExceptionReport", namespaces):
-                raise ows.ExceptionReport(tr)
-        except ows.ExceptionReport:
-            raise
-        except BaseException:
-            return response
+        return openURL(base_url, data, method, username=self.username, password=self.password)
 
     def get_operation_by_name(self, name): 
         """
@@ -24,6 +24,22 @@ class SensorML(object):
         for system in self._root.findall(nspath_eval('sml:member/sml:System', namespaces)):
             self.systems.append(SystemMetadata(system))
 
+def system_metadata(response):
+    """
+        Return the SystemMetadata of the first system of a DescribeSensor
+        response: a SensorML document, as is or wrapped in a SOS 2.0
+        swes:DescribeSensorResponse.  None when it describes no system.
+    """
+    root = etree.fromstring(response) if isinstance(response, str) else response
+    if hasattr(root, 'getroot'):
+        root = root.getroot()
+    if root.tag != nspath_eval('sml:SensorML', namespaces):
+        root = root.find('.//' + nspath_eval('sml:SensorML', namespaces))
+        if root is None:
+            raise ValueError('No SensorML document in the response')
+    systems = SensorML(root).systems
+    return systems and systems[0] or None
+
 class SystemMetadata(object):
     """
     <sml:System gml:id="station-52402">
@@ -78,33 +94,44 @@ class SystemMetadata(object):
     
         self.components = {}
 
+        # attribute -> lower case key -> value, for the case insensitive lookups
+        self._indexes = {}
+        for attribute in ['identifiers', 'contacts', 'classifiers']:
+            self._indexes[attribute] = dict((k.lower(), v) for k, v in getattr(self, attribute).iteritems() if k is not None)
+
         #TODO: Components, timePosition, validTime, positiion/location/positions, 
 
+    def _lookup(self, attribute, key):
+        """
+            Return the value of a metadata dict by case insensitive key, None when missing
+        """
+        return self._indexes[attribute].get(key.lower())
+
     def get_identifier_by_name(self, name):
         """
             Return a IdentifierMetadata by name, case insensitive
         """
-        for identifier in self.identifiers.keys():
-            if identifier.lower() == name.lower():
-                return self.identifiers[identifier]
+        value = self._lookup('identifiers', name)
+        if value is not None:
+            return value
         raise KeyError, "No Identifier with name: %s" % name
 
     def get_contact_by_role(self, role):
         """
             Return a ContactMetadata by role, case insensitive
         """
-        for contact in self.contacts.keys():
-            if contact.lower() == role.lower():
-                return self.contacts[contact]
+        value = self._lookup('contacts', role)
+        if value is not None:
+            return value
         raise KeyError, "No Contasct with role: %s" % role
 
     def get_classifier_by_name(self, name):
         """
             Return a ClassifierMetadata by name, case insensitive
         """
-        for classi in self.classifiers.keys():
-            if classi.lower() == name.lower():
-                return self.classifiers[classi]
+        value = self._lookup('classifiers', name)
+        if value is not None:
+            return value
         raise KeyError, "No Classifier with name: %s" % name
 
     def get_history_by_name(self, name):
@@ -8,7 +8,10 @@
 # =============================================================================
 
 import sys
-from dateutil import parser
+import os
+import socket
+import httplib
+from owslib import isotime
 from datetime import datetime
 import pytz
 from owslib.etree import etree
@@ -65,6 +68,11 @@ class NegativeInfiniteDateTime(object):
 
 first_cap_re = re.compile('(.)([A-Z][a-z]+)')
 all_cap_re = re.compile('([a-z0-9])([A-Z])')
+
+_formatted = {}  # string -> formatted string
+_tag_keys = {}  # element tag -> formatted local name
+MAX_FORMATTED = 4096
+
 def format_string(prop_string):
     """
         Formats a property string to remove spaces and go from CamelCase to pep8
@@ -72,14 +80,37 @@ def format_string(prop_string):
     """
     if prop_string is None:
         return ''
-    st_r = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', prop_string)
+    try:
+        return _formatted[prop_string]
+    except KeyError:
+        pass
+    st_r = first_cap_re.sub(r'\1_\2', prop_string)
     st_r = st_r.replace(' ','')
-    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', st_r).lower()
+    st_r = all_cap_re.sub(r'\1_\2', st_r).lower()
+    if len(_formatted) >= MAX_FORMATTED:
+        _formatted.clear()
+    _formatted[prop_string] = st_r
+    return st_r
 
-def xml_to_dict(root, prefix=None, depth=1, diction=None):
+def _tag_key(tag):
     """
-        Recursively iterates through an xml element to convert each element in the tree to a (key,val). Where key is the element
-        tag and val is the inner-text of the element. Note that this recursively go through the tree until the depth specified.
+        Return the formatted local name of an element tag (memoized, documents repeat few tags)
+    """
+    try:
+        return _tag_keys[tag]
+    except KeyError:
+        pass
+    key = format_string(tag.split('}')[-1])
+    if len(_tag_keys) >= MAX_FORMATTED:
+        _tag_keys.clear()
+    _tag_keys[tag] = key
+    return key
+
+def xml_to_dict(root, prefix=None, depth=1, diction=None, keys=None):
+    """
+        Iterates through an xml element to convert each element in the tree to a (key,val). Where key is the element
+        tag and val is the inner-text of the element. Note that this goes through the tree until the depth specified,
+        in document order.
 
         Parameters
         ===========
@@ -87,6 +118,7 @@ def xml_to_dict(root, prefix=None, depth=1, diction=None):
         :prefix - a string to prepend to the resulting key (optional)
         :depth - the number of depths to process in the tree (optional)
         :diction - the dictionary to insert the (tag,text) pairs into (optional)
+        :keys - the keys to return, the other elements are skipped (optional)
 
         Return
         =======
@@ -95,22 +127,31 @@ def xml_to_dict(root, prefix=None, depth=1, diction=None):
         same tag in the tree.
     """
     ret = diction if diction is not None else dict()
-    for child in root:
-        val = testXMLValue(child)
-        # skip values that are empty or None
-        if val is None or val == '':
-            if depth > 1:
-                ret = xml_to_dict(child,prefix=prefix,depth=(depth-1),diction=ret)
-            continue
-
-        key = format_string(child.tag.split('}')[-1])
-
-        if prefix is not None:
-            key = prefix + key
-
-        ret[key] = val
-        if depth > 1:
-            ret = xml_to_dict(child,prefix=prefix,depth=(depth-1),diction=ret)
+    if keys is not None:
+        keys = set(keys)
+    # iterators over the children of the elements being walked, with the depth left below them
+    stack = [(iter(root), depth)]
+    while stack:
+        children, left = stack[-1]
+        for child in children:
+            tag = child.tag
+            if not isinstance(tag, basestring):  # comments and processing instructions
+                continue
+            val = child.text
+            if val:
+                val = val.strip()
+            # skip values that are empty or None
+            if val:
+                key = _tag_key(tag)
+                if prefix is not None:
+                    key = prefix + key
+                if keys is None or key in keys:
+                    ret[key] = val
+            if left > 1 and len(child):
+                stack.append((iter(child), left - 1))
+                break
+        else:
+            stack.pop()
 
     return ret
 
@@ -304,6 +345,104 @@ def http_post(url=None, request=None, lang='en-US', timeout=10):
 
         return response
 
+def download(url, filepath, username=None, password=None, chunksize=65536, resume=False, retries=3, progress=None, timeout=None, data=None, cookies=None):
+    """
+
+    Stream the content of a URL to a file in chunks, without holding it
+    in memory.  Interrupted transfers are resumed with HTTP Range
+    requests when the server supports them.  Returns the size of the
+    file in bytes.
+
+    Parameters
+    ----------
+
+    - url: the URL to download
+    - filepath: path of the output file
+    - username: optional user name for HTTP Basic authentication
+    - password: optional password for HTTP Basic authentication
+    - chunksize: number of bytes read and written at a time (default is 65536)
+    - resume: complete an existing partial file instead of overwriting it (default is False)
+    - retries: number of times an interrupted transfer is resumed (default is 3)
+    - progress: optional function(bytes written, total bytes or None) called after each chunk
+    - timeout: optional timeout in seconds
+    - data: optional body of a POST request, the URL is requested with GET otherwise
+    - cookies: optional value of the Cookie header
+
+    """
+
+    if username and password:
+        passman = HTTPPasswordMgrWithDefaultRealm()
+        passman.add_password(None, url, username, password)
+        openit = urllib2.build_opener(HTTPBasicAuthHandler(passman)).open
+    else:
+        openit = urlopen
+
+    offset = 0
+    if resume and os.path.exists(filepath):
+        offset = os.path.getsize(filepath)
+    else:
+        open(filepath, 'wb').close()
+
+    attempt = 0
+    while True:
+        req = Request(url, data)
+        if data is not None and data.lstrip().startswith('<'):
+            req.add_header('Content-Type', 'text/xml')
+        if cookies is not None:
+            req.add_header('Cookie', cookies)
+        if offset > 0:
+            req.add_header('Range', 'bytes=%d-' % offset)
+        try:
+            if timeout is None:
+                u = openit(req)
+            else:
+                u = openit(req, timeout=timeout)
+        except HTTPError, e:
+            if e.code == 416 and offset > 0:  # nothing left to transfer
+                return offset
+            raise
+
+        if offset > 0 and u.getcode() != 206:  # Range not supported, start over
+            offset = 0
+
+        total = None
+        length = u.info().get('Content-Length')
+        if length is not None:
+            total = offset + int(length)
+
+        written = offset
+        f = open(filepath, offset > 0 and 'r+b' or 'wb')
+        try:
+            f.seek(offset)
+            f.truncate()
+            while True:
+                chunk = u.read(chunksize)
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+                if progress is not None:
+                    progress(written, total)
+        except (IOError, socket.error, httplib.HTTPException), err:
+            f.close()
+            u.close()
+            attempt += 1
+            if attempt > retries:
+                raise
+            offset = written
+            continue
+        f.close()
+        u.close()
+
+        if total is not None and written < total:  # connection closed early
+            attempt += 1
+            if attempt > retries:
+                raise IOError('Incomplete download of %s: %d of %d bytes' % (url, written, total))
+            offset = written
+            continue
+
+        return written
+
 def xml2string(xml):
     """
 
@@ -403,7 +542,7 @@ Would be 2006-07-27T21:10:00Z, not 'now'
         return None
 
     try:
-        dt = parser.parse(element.text)
+        dt = isotime.parse(element.text)
     except Exception:
         att = testXMLValue(element.attrib.get('indeterminatePosition'), True)
         if att and att == 'now':
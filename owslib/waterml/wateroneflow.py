@@ -0,0 +1,252 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Client of CUAHSI WaterOneFlow services (HTTP GET interface of the *Object methods)
+
+The WaterML documents are parsed with the WaterML_1_0 / WaterML_1_1 parsers.
+The site and variable catalogues are cached, and GetValues requests for many
+(site, variable, period) tuples are split into chunks of time, sent
+concurrently (never more than the limit of the host at once) and their value
+elements streamed straight into ValueColumns, one per (site, variable):
+
+    wof = WaterOneFlow('http://hydroportal.cuahsi.org/nwisdv/cuahsi_1_1.asmx')
+    site = wof.get_site_info('NWISDV:10109000')
+    columns = wof.get_values_batch([('NWISDV:10109000', 'NWISDV:00060', '2000-01-01', '2010-01-01'),
+                                    ('NWISDV:10105900', 'NWISDV:00060', '2000-01-01', '2010-01-01')],
+                                   chunk=timedelta(days=365))
+"""
+
+import threading
+import urlparse
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import timedelta
+from multiprocessing.pool import ThreadPool
+from StringIO import StringIO
+from urllib import urlencode
+
+from owslib import isotime
+from owslib.etree import etree
+from owslib.util import openURL
+from owslib.waterml.wml import ValueColumns, namespaces
+from owslib.waterml.wml10 import WaterML_1_0
+from owslib.waterml.wml11 import WaterML_1_1
+
+DEFAULT_HOST_LIMIT = 4
+
+_hosts = {}  # host -> BoundedSemaphore
+_hosts_lock = threading.Lock()
+
+
+def set_host_limit(url, limit):
+    """ Set the maximum number of concurrent requests sent to the host of url """
+    host = urlparse.urlparse(url).netloc
+    with _hosts_lock:
+        _hosts[host] = threading.BoundedSemaphore(limit)
+
+
+def _host(url):
+    host = urlparse.urlparse(url).netloc
+    with _hosts_lock:
+        semaphore = _hosts.get(host)
+        if semaphore is None:
+            semaphore = _hosts[host] = threading.BoundedSemaphore(DEFAULT_HOST_LIMIT)
+    return semaphore
+
+
+def periods(begin, end, chunk):
+    """
+
+    Split [begin, end] into consecutive periods of at most chunk, returns a
+    list of (begin, end) ISO 8601 strings; consecutive periods share a bound
+
+    Parameters
+    ----------
+
+    - begin: datetime or ISO 8601 string
+    - end: datetime or ISO 8601 string
+    - chunk: timedelta, None for a single period
+
+    """
+
+    start = isotime.parse(begin) if isinstance(begin, basestring) else begin
+    stop = isotime.parse(end) if isinstance(end, basestring) else end
+    if stop < start:
+        raise ValueError('end is before begin')
+    bounds = [start]
+    if chunk is not None and chunk > timedelta(0):
+        while bounds[-1] + chunk < stop:
+            bounds.append(bounds[-1] + chunk)
+    bounds.append(stop)
+    iso = lambda t: t.strftime('%Y-%m-%dT%H:%M:%S')
+    return [(iso(a), iso(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def parse_values(source, version='1.1'):
+    """
+
+    Stream the value elements of a GetValues response into ValueColumns,
+    each element is discarded once decoded
+
+    Parameters
+    ----------
+
+    - source: file name, file object or XML string of the response
+    - version: WaterML version, 1.0 or 1.1 (default is 1.1)
+
+    """
+
+    if isinstance(source, basestring) and source.lstrip().startswith('<'):
+        source = StringIO(source)
+    tag = namespaces['wml' + version] + 'value'
+
+    def elements():
+        for event, element in etree.iterparse(source, events=('end',)):
+            if element.tag == tag:
+                yield element
+                element.clear()
+                # drop the values already decoded, not only their content
+                if hasattr(element, 'getprevious'):
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+
+    return ValueColumns(elements())
+
+
+class WaterOneFlow(object):
+    """ Client of a WaterOneFlow service """
+    def __init__(self, url, version='1.1', authToken='', maxConcurrent=4, username=None, password=None):
+        """
+
+        Initialize
+
+        Parameters
+        ----------
+
+        - url: URL of the service, e.g. http://host/cuahsi_1_1.asmx
+        - version: WaterML version of the service, 1.0 or 1.1 (default is 1.1)
+        - authToken: authentication token of the requests (default is none)
+        - maxConcurrent: maximum number of GetValues requests in progress at once (default is 4)
+        - username: optional HTTP username
+        - password: optional HTTP password
+
+        """
+
+        if version not in ['1.0', '1.1']:
+            raise ValueError('Unsupported WaterML version: %s' % version)
+        self.url = url.rstrip('/')
+        self.version = version
+        self.authToken = authToken
+        self.maxConcurrent = maxConcurrent
+        self.username = username
+        self.password = password
+        self._sites = {}  # tuple of site codes -> SitesResponse
+        self._site_info = {}  # site code -> SitesResponse
+        self._variables = {}  # variable code -> VariablesResponse
+
+    def _open(self, method, **params):
+        params['authToken'] = self.authToken
+        url = '%s/%s' % (self.url, method)
+        return openURL(url, urlencode(params), 'Get', username=self.username, password=self.password)
+
+    def _response(self, method, **params):
+        xml = self._open(method, **params).read()
+        parser = self.version == '1.0' and WaterML_1_0 or WaterML_1_1
+        return parser(xml).response
+
+    def get_sites(self, sites=None):
+        """ Return the SitesResponse of GetSites, for the given site codes or all of them (cached) """
+        key = tuple(sites or [])
+        if key not in self._sites:
+            self._sites[key] = self._response('GetSitesObject', site=','.join(key))
+        return self._sites[key]
+
+    def get_site_info(self, site):
+        """ Return the SitesResponse of GetSiteInfo for a site code, e.g. 'NWISDV:10109000' (cached) """
+        if site not in self._site_info:
+            self._site_info[site] = self._response('GetSiteInfoObject', site=site)
+        return self._site_info[site]
+
+    def get_variable_info(self, variable=None):
+        """ Return the VariablesResponse of GetVariableInfo for a variable code, or all variables (cached) """
+        key = variable or ''
+        if key not in self._variables:
+            self._variables[key] = self._response('GetVariableInfoObject', variable=key)
+        return self._variables[key]
+
+    def get_values(self, site, variable, begin=None, end=None):
+        """ Return the TimeSeriesResponse of GetValues for a site code, variable code and period """
+        return self._response('GetValuesObject', location=site, variable=variable,
+                              startDate=begin or '', endDate=end or '')
+
+    def _get_columns(self, request):
+        site, variable, begin, end = request['key']
+        url = '%s/GetValuesObject' % self.url
+        host = _host(url)
+        host.acquire()
+        try:
+            response = self._open('GetValuesObject', location=site, variable=variable, startDate=begin, endDate=end)
+            try:
+                return parse_values(response, self.version)
+            finally:
+                response.close()
+        except Exception, err:
+            request['error'] = err
+            return None
+        finally:
+            host.release()
+
+    def get_values_batch(self, requests, chunk=timedelta(days=365), maxConcurrent=None, ignore_errors=False):
+        """
+
+        Send the GetValues requests of many (site, variable, begin, end)
+        tuples concurrently, each period split into chunks, and return an
+        OrderedDict of (site, variable) -> ValueColumns, in the order of the
+        requests and chunks
+
+        Parameters
+        ----------
+
+        - requests: list of (site code, variable code, begin, end), begin / end datetime or ISO 8601 strings
+        - chunk: maximum period of one request, timedelta (default is 365 days), None for no split
+        - maxConcurrent: maximum number of requests in progress at once (default is that of the client)
+        - ignore_errors: leave out the chunks that failed, instead of raising the first error (default is False)
+
+        """
+
+        plan = []
+        for site, variable, begin, end in requests:
+            previous = None  # position of the previous chunk of the period
+            for a, b in periods(begin, end, chunk):
+                plan.append({'key': (site, variable, a, b), 'error': None, 'previous': previous})
+                previous = len(plan) - 1
+
+        maxConcurrent = maxConcurrent or self.maxConcurrent
+        if len(plan) > 1 and maxConcurrent > 1:
+            pool = ThreadPool(min(maxConcurrent, len(plan)))
+            try:
+                results = pool.map(self._get_columns, plan)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [self._get_columns(request) for request in plan]
+
+        errors = [request['error'] for request in plan if request['error'] is not None]
+        if errors and not ignore_errors:
+            raise errors[0]
+
+        merged = OrderedDict()
+        for request, columns in zip(plan, results):
+            key = request['key'][:2]
+            if key not in merged:
+                merged[key] = ValueColumns([])
+            if columns is None:
+                continue
+            start = 0
+            previous = request['previous'] is not None and results[request['previous']]
+            if previous and previous.ascending() and columns.ascending():
+                # the values at the bound shared with the previous chunk of the period are already in
+                start = bisect_right(columns.times, previous.times[-1])
+            merged[key].extend(columns, start)
+        return merged
@@ -1,8 +1,13 @@
 from owslib.etree import etree
 from owslib.util import nspath, testXMLValue, openURL
 from owslib.util import xml_to_dict as _xml_to_dict
+import calendar
+import math
+from array import array
+from bisect import bisect_left, bisect_right
 from datetime import datetime
-from dateutil import parser
+from owslib import isotime
+from owslib.swe.common import Categories
 
 namespaces = {
     'wml1.1':'{http://www.cuahsi.org/waterML/1.1/}',
@@ -20,10 +25,14 @@ class XMLParser(object):
         a little easier.
     """
     def __init__(self,xml_root,namespace):
-        try:
-            self._root = etree.parse(xml_root)
-        except:
+        if etree.iselement(xml_root):
+            # nothing to parse, and no exception to raise and catch for every element
             self._root = xml_root
+        else:
+            try:
+                self._root = etree.parse(xml_root)
+            except:
+                self._root = xml_root
 
         if not namespace in namespaces:
             raise ValueError('Unsupported namespace passed in to parser!')
@@ -68,9 +77,9 @@ class SitesResponse(XMLParser):
             return self.sites[key]
 
         if isinstance(key,str):
-            site = [site for site in self.sites for code in site.site_info.site_codes if code == key]
-            if len(site) > 0:
-                return site[0]
+            site = self._sites_by_code.get(key)
+            if site is not None:
+                return site
 
         raise KeyError('Unknown key ' + str(key))
 
@@ -89,6 +98,30 @@ class SitesResponse(XMLParser):
         # except:
         #   raise ValueError('Cannot parse sitesResponse element correctly')
 
+        # site code -> (first) site
+        self._sites_by_code = {}
+        for site in self.sites:
+            for code in site.site_info.site_codes:
+                self._sites_by_code.setdefault(code, site)
+        self._site_index = None
+
+    def sites_in_bbox(self, bbox):
+        """
+            Return the sites located in bbox (min longitude, min latitude, max longitude, max latitude), in
+            response order, using a grid index of the site locations built on first use
+        """
+        if self._site_index is None:
+            self._site_index = SiteIndex(self.sites)
+        return self._site_index.within(bbox)
+
+    def nearest_sites(self, longitude, latitude, count=1):
+        """
+            Return the count sites nearest to a location (great circle distance), nearest first
+        """
+        if self._site_index is None:
+            self._site_index = SiteIndex(self.sites)
+        return self._site_index.nearest(longitude, latitude, count)
+
     """Accesability properties/methods"""
     @property
     def site_codes(self):
@@ -98,6 +131,99 @@ class SitesResponse(XMLParser):
     def site_names(self):
         return [site.site_info.site_name for site in self.sites]
 
+class SiteIndex(object):
+    """
+        Grid index of the site locations (geogLocation longitude / latitude, in degrees), for
+        bounding box and nearest site queries.  The cell size follows the extent and the
+        number of the locations, about one location per cell.
+    """
+    def __init__(self, sites):
+        self.sites = list(sites)
+        self._points = []  # (longitude, latitude, position)
+        for position, site in enumerate(self.sites):
+            for lon, lat in site.geo_coords:
+                try:
+                    self._points.append((float(lon), float(lat), position))
+                except (TypeError, ValueError):
+                    pass
+
+        self._cells = {}  # (col, row) -> list of point numbers
+        if not self._points:
+            self.extent = None
+            return
+        lons = [p[0] for p in self._points]
+        lats = [p[1] for p in self._points]
+        self.extent = (min(lons), min(lats), max(lons), max(lats))
+        width, height = self.extent[2] - self.extent[0], self.extent[3] - self.extent[1]
+        self.cellsize = math.sqrt(max(width, 1e-6) * max(height, 1e-6) / len(self._points))
+        for i, (lon, lat, position) in enumerate(self._points):
+            self._cells.setdefault(self._cell(lon, lat), []).append(i)
+
+    def _cell(self, lon, lat):
+        return (int((lon - self.extent[0]) // self.cellsize), int((lat - self.extent[1]) // self.cellsize))
+
+    def _points_within(self, bbox):
+        """ Numbers of the points in bbox, the cells visited are those of bbox clipped to the extent """
+        if self.extent is None:
+            return []
+        minx, miny = max(bbox[0], self.extent[0]), max(bbox[1], self.extent[1])
+        maxx, maxy = min(bbox[2], self.extent[2]), min(bbox[3], self.extent[3])
+        if minx > maxx or miny > maxy:
+            return []
+        (col0, row0), (col1, row1) = self._cell(minx, miny), self._cell(maxx, maxy)
+        result = []
+        for col in xrange(col0, col1 + 1):
+            for row in xrange(row0, row1 + 1):
+                for i in self._cells.get((col, row), ()):
+                    lon, lat = self._points[i][:2]
+                    if bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]:
+                        result.append(i)
+        return result
+
+    def within(self, bbox):
+        """ Return the sites located in bbox (minx, miny, maxx, maxy), in response order """
+        positions = sorted(set(self._points[i][2] for i in self._points_within(bbox)))
+        return [self.sites[p] for p in positions]
+
+    def nearest(self, longitude, latitude, count=1):
+        """ Return the count sites nearest to a location (great circle distance), nearest first """
+        if self.extent is None or count < 1:
+            return []
+        sites = len(set(p[2] for p in self._points))
+        radius = self.cellsize  # in degrees of latitude
+        while True:
+            if abs(latitude) + radius >= 89.0:
+                lon_radius = 360.0
+            else:
+                lon_radius = radius / math.cos(math.radians(abs(latitude) + radius))
+            minx, maxx = longitude - lon_radius, longitude + lon_radius
+            candidates = set(self._points_within((minx, latitude - radius, maxx, latitude + radius)))
+            # the part of the search box across the antimeridian
+            if minx < -180.0:
+                candidates.update(self._points_within((minx + 360.0, latitude - radius, 180.0, latitude + radius)))
+            if maxx > 180.0:
+                candidates.update(self._points_within((-180.0, latitude - radius, maxx - 360.0, latitude + radius)))
+            best = {}  # position -> distance, in degrees of great circle
+            for i in candidates:
+                lon, lat, position = self._points[i]
+                distance = _angle(longitude, latitude, lon, lat)
+                if distance < best.get(position, 360.0):
+                    best[position] = distance
+            found = sorted(best.items(), key=lambda item: (item[1], item[0]))[:count]
+            everything = lon_radius >= 360.0 and radius >= 180.0
+            if len(found) == min(count, sites) and (found[-1][1] <= radius or everything):
+                # the search box holds the circle around the location through the farthest site kept
+                return [self.sites[p] for p, d in found]
+            radius = max(radius * 2, found[-1][1] if len(found) == min(count, sites) else 0)
+
+
+def _angle(lon1, lat1, lon2, lat2):
+    """ Great circle distance between two locations, in degrees """
+    lon1, lat1, lon2, lat2 = map(math.radians, [lon1, lat1, lon2, lat2])
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return math.degrees(2 * math.asin(min(1.0, math.sqrt(a))))
+
+
 class QueryInfo(XMLParser):
     """
     """
@@ -115,7 +241,7 @@ class QueryInfo(XMLParser):
         # try:
             # create queryinfo object from dict
         xml_dict = _xml_to_dict(self._root)
-        self.creation_time = parser.parse(xml_dict.get('creation_time')) if xml_dict.get('creation_time') is not None else None
+        self.creation_time = isotime.parse(xml_dict.get('creation_time')) if xml_dict.get('creation_time') is not None else None
         self.notes = [testXMLValue(note) for note in self._findall('note')]
         self.criteria = Criteria(self._find('criteria'), self._ns)
         # except:
@@ -141,12 +267,12 @@ class Criteria(XMLParser):
         self.location_param = xml_dict.get('location_param')
         self.variable_param = xml_dict.get('variable_param')
         try:
-            self.begin_date_time = parser.parse(xml_dict['begin_date_time'])
+            self.begin_date_time = isotime.parse(xml_dict['begin_date_time'])
         except:
             self.begin_date_time = None
 
         try:
-            self.end_date_time = parser.parse(xml_dict['end_date_time'])
+            self.end_date_time = isotime.parse(xml_dict['end_date_time'])
         except:
             self.end_date_time = None
 
@@ -168,9 +294,9 @@ class Site(XMLParser):
             return self.series_catalogs[key]
 
         if isinstance(key,str):
-            var = [series.variable for catalog in self.series_catalogs for series in catalog if series.code == key]
-            if len(var) > 0:
-                return var[0]
+            var = self._variables_by_code.get(key)
+            if var is not None:
+                return var
 
         raise KeyError('Unknown key ' + str(key))
 
@@ -213,6 +339,11 @@ class Site(XMLParser):
         # try:
         self.site_info = SiteInfo(self._find('siteInfo'), self._ns)
         self.series_catalogs = [SeriesCatalog(elm, self._ns) for elm in self._findall('seriesCatalog')]
+        # variable code -> (first) variable
+        self._variables_by_code = {}
+        for catalog in self.series_catalogs:
+            for series in catalog:
+                self._variables_by_code.setdefault(series.code, series.variable)
             # self.extension = Extension(self._find('extension'), self._ns)
         # except:
         #   raise ValueError('Unable to parse site element correctly')
@@ -331,9 +462,9 @@ class SeriesCatalog(XMLParser):
             return self.series[key]
 
         if isinstance(key,str):
-            srs = [series for series in self.series if series.code == key]
-            if len(srs) > 0:
-                return srs[0]
+            srs = self._series_by_code.get(key)
+            if srs is not None:
+                return srs
 
         raise KeyError('Unknown key ' + str(key))
 
@@ -346,6 +477,10 @@ class SeriesCatalog(XMLParser):
 
         # try:
         self.series = [Series(elm,self._ns) for elm in self._findall('series')]
+        # variable code -> (first) series
+        self._series_by_code = {}
+        for series in self.series:
+            self._series_by_code.setdefault(series.code, series)
         # except:
         #   raise ValueError('Unable to properly parse the seriesCatalog element')
 
@@ -379,10 +514,10 @@ class Series(XMLParser):
         self.sample_medium = xml_dict.get('sample_medium')
         self.data_type = xml_dict.get('data_type')
         # date-time
-        self.begin_date_time = parser.parse(xml_dict.get('begin_date_time'))
-        self.begin_date_time_utc = parser.parse(xml_dict.get('begin_date_time_utc')) if xml_dict.get('begin_date_time_utc') is not None else None
-        self.end_date_time = parser.parse(xml_dict.get('end_date_time'))
-        self.end_date_time_utc = parser.parse(xml_dict.get('end_date_time_utc')) if xml_dict.get('end_date_time_utc') is not None else None
+        self.begin_date_time = isotime.parse(xml_dict.get('begin_date_time'))
+        self.begin_date_time_utc = isotime.parse(xml_dict.get('begin_date_time_utc')) if xml_dict.get('begin_date_time_utc') is not None else None
+        self.end_date_time = isotime.parse(xml_dict.get('end_date_time'))
+        self.end_date_time_utc = isotime.parse(xml_dict.get('end_date_time_utc')) if xml_dict.get('end_date_time_utc') is not None else None
         # method info
         self.method_description = xml_dict.get('method_description')
         self.method_code = xml_dict.get('method_code')
@@ -583,10 +718,10 @@ class TimeSeriesResponse(XMLParser):
 
     def get_series_by_variable(self,var_name=None,var_code=None):
         if var_code is not None:
-            return [s for s in self.time_series if s.variable.variable_code == var_code]
+            return list(self._series_by_code.get(var_code, []))
 
         elif var_name is not None:
-            return [series for series in self.time_series if series.variable.variable_name == var_name]
+            return list(self._series_by_name.get(var_name, []))
 
         return None
 
@@ -595,6 +730,12 @@ class TimeSeriesResponse(XMLParser):
             qi = self._find('queryInfo')
             self.query_info = QueryInfo(qi,self._ns)
             self.time_series = [TimeSeries(series,self._ns) for series in self._findall('timeSeries')]
+            # variable code / name -> series, in response order
+            self._series_by_code = {}
+            self._series_by_name = {}
+            for series in self.time_series:
+                self._series_by_code.setdefault(series.variable.variable_code, []).append(series)
+                self._series_by_name.setdefault(series.variable.variable_name, []).append(series)
         except:
             raise
 
@@ -623,27 +764,34 @@ class Values(XMLParser):
             yield v
 
     """Accessor properties/methods"""
-    def get_date_values(self,method_id=None,source_id=None,sample_id=None,quality_level=None,utc=False):
-        varl = [v for v in self.values]
-        if method_id is not None:
-            varl = [v for v in varl if v.method_id == method_id]
-
-        if source_id is not None:
-            varl = [v for v in varl if v.source_id == source_id]
-
-        if sample_id is not None:
-            varl = [v for v in varl if v.sample_id == sample_id]
-
-        if quality_level is not None:
-            varl = [v for v in varl if v.quality_control_level == quality_level]
+    def get_date_values(self,method_id=None,source_id=None,sample_id=None,quality_level=None,utc=False,begin=None,end=None):
+        """
+            Return the (date time, value) tuples of the values matching the given ids, and
+            time range [begin, end] (datetime, ISO 8601 string or seconds since the epoch)
+        """
+        indexes = self.columns.select(method_id, source_id, sample_id, quality_level, begin, end, utc)
+        varl = [self.values[i] for i in indexes]
 
         if not utc:
             return [(v.date_time,v.value) for v in varl]
         else:
             return [(v.date_time_utc,v.value) for v in varl]
 
+    def get_date_value_arrays(self,method_id=None,source_id=None,sample_id=None,quality_level=None,utc=False,begin=None,end=None):
+        """
+            As get_date_values, but return a (times, values) pair of arrays of doubles, times
+            in seconds since the epoch (see ValueColumns), without creating Value objects
+        """
+        columns = self.columns
+        times = columns.times_utc if utc else columns.times
+        indexes = columns.select(method_id, source_id, sample_id, quality_level, begin, end, utc)
+        if isinstance(indexes, xrange):
+            # a contiguous run: one slice of each array
+            start = indexes[0] if len(indexes) else 0
+            return times[start:start + len(indexes)], columns.values[start:start + len(indexes)]
+        return array('d', [times[i] for i in indexes]), array('d', [columns.values[i] for i in indexes])
+
     def parse_values(self):
-        xml_dict = _xml_to_dict(self._root)
         # method info
         self.methods = [Method(method,self._ns) for method in self._findall('method')]
 
@@ -671,8 +819,159 @@ class Values(XMLParser):
             unit = self._find('unit')
             self.unit = Unit(unit, self._ns) if unit is not None else None
 
-        # values
-        self.values = [Value(val, self._ns) for val in self._findall('value')]
+        # values, decoded into columns in one pass, Value objects are created on access
+        self.columns = ValueColumns(self._findall('value'))
+        self.values = ValueList(self._root, self._ns)
+
+
+class ValueColumns(object):
+    """
+        Columnar form of the value elements of a values element, in document order:
+        times and times_utc are arrays of doubles, seconds since the epoch of dateTime
+        and dateTimeUTC (NaN when missing, times without a time zone are taken as UTC),
+        values is an array of doubles (NaN when not a number), and method_id, source_id,
+        sample_id and quality_control_level are integer coded columns (Categories: codes
+        indexing the distinct ids, -1 when missing).  The arrays expose the buffer
+        interface, e.g. numpy.frombuffer(columns.values) does not copy them.
+    """
+    def __init__(self, elements):
+        self.values = array('d')
+        self.method_id = Categories()
+        self.source_id = Categories()
+        self.sample_id = Categories()
+        self.quality_control_level = Categories()
+
+        times, times_utc = [], []
+        nan = float('nan')
+        values_append = self.values.append
+        for element in elements:
+            d = element.attrib
+            times.append(d.get('dateTime'))
+            times_utc.append(d.get('dateTimeUTC'))
+            try:
+                values_append(float(element.text))
+            except (TypeError, ValueError):
+                values_append(nan)
+            self.method_id.append(d.get('methodID'))
+            self.source_id.append(d.get('sourceID'))
+            self.sample_id.append(d.get('sampleID'))
+            self.quality_control_level.append(d.get('qualityControlLevel'))
+
+        self.times = isotime.epochs(times)
+        self.times_utc = isotime.epochs(times_utc)
+        # time ranges are found by binary search in sorted (and complete) time columns
+        self._sorted = {False: _ascending(self.times), True: _ascending(self.times_utc)}
+
+    def __len__(self):
+        return len(self.values)
+
+    def ascending(self, utc=False):
+        """
+            True when the times (times_utc when utc) are all known and in ascending order
+        """
+        return self._sorted[utc]
+
+    def extend(self, other, start=0):
+        """
+            Append the rows of other ValueColumns, from row start on
+        """
+        self.values.extend(other.values[start:])
+        for name in ['method_id', 'source_id', 'sample_id', 'quality_control_level']:
+            column, append = getattr(other, name), getattr(self, name).append
+            for i in xrange(start, len(other)):
+                append(column[i])
+        for utc, name in [(False, 'times'), (True, 'times_utc')]:
+            times, added = getattr(self, name), getattr(other, name)[start:]
+            self._sorted[utc] = self._sorted[utc] and _ascending(added) and not (len(times) and len(added) and times[-1] > added[0])
+            times.extend(added)
+
+    def select(self, method_id=None, source_id=None, sample_id=None, quality_level=None, begin=None, end=None, utc=False):
+        """
+            Return the indexes of the values matching all the given ids, with a time in [begin, end]
+            (datetime, ISO 8601 string or seconds since the epoch), in document order.  When only
+            the time range is given, the indexes are an xrange.
+        """
+        times = self.times_utc if utc else self.times
+        start, stop = 0, len(self)
+        lower = _seconds(begin) if begin is not None else None
+        upper = _seconds(end) if end is not None else None
+        if self._sorted[utc]:
+            if lower is not None:
+                start = bisect_left(times, lower)
+            if upper is not None:
+                stop = max(start, bisect_right(times, upper))
+            lower = upper = None
+        indexes = xrange(start, stop)
+
+        # each filter is a mask over the codes of an integer coded column
+        for column, key in [(self.method_id, method_id), (self.source_id, source_id),
+                            (self.sample_id, sample_id), (self.quality_control_level, quality_level)]:
+            if key is None:
+                continue
+            code = column.code(key)
+            if code is None:
+                return []
+            codes = column.codes
+            indexes = [i for i in indexes if codes[i] == code]
+
+        if lower is not None or upper is not None:
+            lower = -float('inf') if lower is None else lower
+            upper = float('inf') if upper is None else upper
+            indexes = [i for i in indexes if lower <= times[i] <= upper]
+        return indexes
+
+
+def _ascending(times):
+    """ True when the times are all known and in ascending order """
+    for i in xrange(1, len(times)):
+        if not times[i - 1] <= times[i]:
+            return False
+    return not (len(times) and times[0] != times[0])
+
+
+def _seconds(value):
+    """ Seconds since the epoch of a datetime (naive ones taken as UTC), ISO 8601 string or number """
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+    if isinstance(value, basestring):
+        return isotime.epoch(value)
+    return float(value)
+
+
+class ValueList(object):
+    """
+        Sequence of the Value objects of a values element, each one created on first access
+    """
+    def __init__(self, xml_root, version='wml1.1'):
+        self._root = xml_root
+        self._ns = version
+        self._elements = None
+        self._values = {}
+
+    def _get_elements(self):
+        if self._elements is None:
+            self._elements = self._root.findall(ns(self._ns) + 'value')
+        return self._elements
+
+    def __len__(self):
+        return len(self._get_elements())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in xrange(*key.indices(len(self)))]
+        elements = self._get_elements()
+        if key < 0:
+            key += len(elements)
+        if key < 0 or key >= len(elements):
+            raise IndexError('Value index out of range')
+        value = self._values.get(key)
+        if value is None:
+            value = self._values[key] = Value(elements[key], self._ns)
+        return value
+
+    def __iter__(self):
+        for i in xrange(len(self)):
+            yield self[i]
 
 
 class Value(XMLParser):
@@ -686,9 +985,9 @@ class Value(XMLParser):
             d = self._root.attrib
             self.qualifiers = d.get('qualifiers')
             self.censor_code = d.get('censorCode')
-            self.date_time = parser.parse(d.get('dateTime')) if d.get('dateTime') is not None else None
+            self.date_time = isotime.parse(d.get('dateTime')) if d.get('dateTime') is not None else None
             self.time_offset = d.get('timeOffset')
-            self.date_time_utc = parser.parse(d.get('dateTimeUTC')) if d.get('dateTimeUTC') is not None else None
+            self.date_time_utc = isotime.parse(d.get('dateTimeUTC')) if d.get('dateTimeUTC') is not None else None
             self.method_id = d.get('methodID')
             self.source_id = d.get('sourceID')
             self.accuracy_std_dev = d.get('accuracyStdDev')
@@ -890,13 +1189,13 @@ class VariablesResponse(XMLParser):
             return self.variables[key]
 
         if isinstance(key,str):
-            v = [var for var in self.variables if var.variable_code == key]
-            if len(v) > 0:
-                return v[0]
+            v = self._variables_by_code.get(key)
+            if v is not None:
+                return v
 
-            v = [var for var in self.variables if var.variable_name == key]
-            if len(v) > 0:
-                return v[0]
+            v = self._variables_by_name.get(key)
+            if v is not None:
+                return v
 
         raise KeyError('Unknown key ' + str(key))
 
@@ -915,6 +1214,12 @@ class VariablesResponse(XMLParser):
             self.query_info = QueryInfo(qi, self._ns) if qi is not None else None
             varis = self._find('variables')
             self.variables = [Variable(var,self._ns) for var in varis.findall(ns(self._ns) + 'variable')]
+            # variable code / name -> (first) variable
+            self._variables_by_code = {}
+            self._variables_by_name = {}
+            for var in self.variables:
+                self._variables_by_code.setdefault(var.variable_code, var)
+                self._variables_by_name.setdefault(var.variable_name, var)
         except:
             raise
 
@@ -53,6 +53,8 @@ c) "Execute"
       from a cached XML file (for debugging or testing purposes)
     - the convenience module function monitorExecution() can be used to periodically check the status of a remote running job, and eventually download the output
       either to a named file, or to a file specified by the server.
+    - the WPSMonitor class can be used to track many running jobs from a single thread, with adaptive polling intervals and
+      status-change callbacks instead of blocking sleeps.
       
       
 Examples
@@ -86,9 +88,18 @@ Also, the directory tests/ contains several examples of well-formed "Execute" re
 
 from owslib.etree import etree
 from owslib.ows import DEFAULT_OWS_NAMESPACE, ServiceIdentification, ServiceProvider, OperationsMetadata
+import os
+import time
+from hashlib import md5
+from collections import OrderedDict
+import base64
+import httplib
+import urlparse
+from urllib2 import HTTPError
 from time import sleep
+from multiprocessing.pool import ThreadPool
 from owslib.util import (testXMLValue, build_get_url, dump, getTypedValue, 
-                  getNamespace, xml2string, nspath, openURL, nspath_eval)
+                  getNamespace, xml2string, nspath, openURL, nspath_eval, download, ServiceException)
 from xml.dom.minidom import parseString
 from owslib.namespaces import Namespaces
 
@@ -150,7 +161,74 @@ class IComplexData():
         Method that returns the object data as an XML snippet, 
         to be inserted into the WPS request document sent to the server.
         """ 
+
+    def writeXml(self, xf):
+        """
+        Optional method that writes the same XML snippet as getXml() to an lxml incremental serializer (etree.xmlfile),
+        used when the request document is streamed (see WPSExecution.writeRequest()).
+        """
     
+class ProcessDescriptionCache(object):
+    """
+    Cache of WPS process descriptions, keyed by service URL, capabilities version and process identifier.
+    Parsed Process objects are kept in memory; if a directory is given, the description documents
+    are also stored on disk, so that they survive between sessions.
+    WebProcessingService invalidates the descriptions of a service when its capabilities change; with skip_caps=True
+    the capabilities are never read, so the stored documents must be invalidated explicitly when the service
+    processes change, with cache.clear(url, stored=True).
+    """
+
+    def __init__(self, directory=None):
+        """
+        directory: optional path to a directory where the process description documents are stored
+        """
+        self.directory = directory
+        self._processes = {}
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, url, version, identifier):
+        # one file name prefix per service, so that its documents can be removed
+        key = md5('\n'.join([version or '', identifier])).hexdigest()
+        return os.path.join(self.directory, '%s-%s.xml' % (md5(url).hexdigest(), key))
+
+    def get(self, url, version, identifier):
+        """
+        Returns the cached Process, or None.
+        """
+        process = self._processes.get((url, version, identifier))
+        if process is None and self.directory is not None:
+            path = self._path(url, version, identifier)
+            if os.path.exists(path):
+                process = Process(etree.parse(path).getroot())
+                self._processes[(url, version, identifier)] = process
+        return process
+
+    def put(self, url, version, process):
+        """
+        Stores a Process parsed from a <ProcessDescription> element.
+        """
+        self._processes[(url, version, process.identifier)] = process
+        if self.directory is not None:
+            out = open(self._path(url, version, process.identifier), 'wb')
+            out.write(etree.tostring(process._root))
+            out.close()
+
+    def clear(self, url=None, stored=False):
+        """
+        Forgets the processes kept in memory, for the given service URL or for all services.
+        Documents stored on disk are left alone, unless stored is True: they are keyed by capabilities version,
+        and stop matching when the capabilities change, but not when the capabilities are not read (skip_caps=True).
+        """
+        for key in self._processes.keys():
+            if url is None or key[0] == url:
+                del self._processes[key]
+        if stored and self.directory is not None:
+            prefix = url is not None and md5(url).hexdigest() + '-' or ''
+            for name in os.listdir(self.directory):
+                if name.startswith(prefix) and name.endswith('.xml'):
+                    os.remove(os.path.join(self.directory, name))
+
 class WebProcessingService(object):
     """
     Class that contains client-side functionality for invoking an OGC Web Processing Service (WPS).
@@ -158,11 +236,14 @@ class WebProcessingService(object):
     Implements IWebProcessingService.
     """
     
-    def __init__(self, url, version=WPS_DEFAULT_VERSION, username=None, password=None, verbose=False, skip_caps=False):
+    def __init__(self, url, version=WPS_DEFAULT_VERSION, username=None, password=None, verbose=False, skip_caps=False, cache=None):
         """
         Initialization method resets the object status.
         By default it will execute a GetCapabilities invocation to the remote service, 
         which can be skipped by using skip_caps=True.
+        The optional 'cache' argument is a ProcessDescriptionCache to share or persist process descriptions,
+        by default process descriptions are cached in memory for this object.
+        With skip_caps=True, descriptions stored on disk are used until cleared with cache.clear(url, stored=True).
         """
         
         # fields passed in from object initializer
@@ -178,6 +259,13 @@ class WebProcessingService(object):
         self.provider = None
         self.operations=[]
         self.processes=[]
+        self.updateSequence = None
+
+        # process descriptions cache, valid for one version of the capabilities
+        if cache is None:
+            cache = ProcessDescriptionCache()
+        self.cache = cache
+        self._cacheVersion = None
 
         if not skip_caps:
             self.getcapabilities()
@@ -201,13 +289,29 @@ class WebProcessingService(object):
 
         # populate the capabilities metadata obects from the XML tree
         self._parseCapabilitiesMetadata(self._capabilities)
+
+        # invalidate the cached process descriptions if the capabilities changed
+        cacheVersion = self.updateSequence
+        if cacheVersion is None:
+            cacheVersion = md5(repr(sorted([(p.identifier, p.processVersion) for p in self.processes]))).hexdigest()
+        if cacheVersion != self._cacheVersion:
+            self.cache.clear(self.url)
+            self._cacheVersion = cacheVersion
         
     def describeprocess(self, identifier, xml=None):
         """
         Requests a process document from a WPS service and populates the process metadata.
         Returns the process object.
+        Process descriptions are cached, a process already described is not requested again
+        until the service capabilities change.
         """
         
+        if xml is None:
+            process = self.cache.get(self.url, self._cacheVersion, identifier)
+            if process is not None:
+                self._addProcess(process)
+                return process
+
         # read capabilities document
         reader = WPSDescribeProcessReader(version=self.version, verbose=self.verbose)
         if xml:
@@ -215,15 +319,71 @@ class WebProcessingService(object):
             rootElement = reader.readFromString(xml)
         else:
             # read from server
-            rootElement = reader.readFromUrl(self.url, identifier)
+            rootElement = reader.readFromUrl(self.url, identifier, username=self.username, password=self.password)
             
         if self.verbose==True:
             print xml2string(etree.tostring(rootElement))
 
         # build metadata objects
         return self._parseProcessMetadata(rootElement)
+
+    def describeprocesses(self, identifiers=None, threads=4):
+        """
+        Requests the descriptions of many processes, and populates the process metadata.
+        Returns the list of process objects, None for the identifiers the service did not describe
+        (unknown identifier, exception report or failed request).
+        The processes not cached yet are first requested all at once with 'identifier=ALL';
+        if the service does not support it, they are requested concurrently, one request per process.
+        
+        identifiers: optional list of process identifiers, by default all the processes listed in the capabilities
+        threads: maximum number of DescribeProcess requests sent concurrently
+        """
         
-    def execute(self, identifier, inputs, output=None, request=None, response=None):
+        if identifiers is None:
+            identifiers = [p.identifier for p in self.processes]
+        else:
+            identifiers = list(identifiers)
+        missing = set(i for i in identifiers if self.cache.get(self.url, self._cacheVersion, i) is None)
+        reader = WPSDescribeProcessReader(version=self.version, verbose=self.verbose)
+        
+        # one request for all the processes
+        if len(missing)>1 or len(identifiers)==0:
+            try:
+                rootElement = reader.readFromUrl(self.url, 'ALL', username=self.username, password=self.password)
+            except Exception:
+                rootElement = None
+            if rootElement is not None:
+                for processDescriptionElement in rootElement.findall( 'ProcessDescription' ):
+                    process = self._parseProcessDescription(processDescriptionElement)
+                    if len(identifiers)==0:
+                        identifiers.append(process.identifier)
+                missing = set(i for i in identifiers if self.cache.get(self.url, self._cacheVersion, i) is None)
+
+        # one request per process, a failure leaves its process undescribed
+        def fetch(identifier):
+            try:
+                return reader.readFromUrl(self.url, identifier, username=self.username, password=self.password)
+            except Exception:
+                return None
+        
+        missing = sorted(missing)
+        if len(missing)>1 and threads>1:
+            pool = ThreadPool(min(threads, len(missing)))
+            try:
+                rootElements = pool.map(fetch, missing)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            rootElements = [fetch(identifier) for identifier in missing]
+        for rootElement in rootElements:
+            # an exception report has no process description
+            if rootElement is not None and rootElement.find('ProcessDescription') is not None:
+                self._parseProcessMetadata(rootElement)
+            
+        return [self.cache.get(self.url, self._cacheVersion, i) for i in identifiers]
+        
+    def execute(self, identifier, inputs, output=None, request=None, response=None, stream=False):
         """
         Submits a WPS process execution request. 
         Returns a WPSExecution object, which can be used to monitor the status of the job, and ultimately retrieve the result.
@@ -233,12 +393,19 @@ class WebProcessingService(object):
         output: optional identifier for process output reference (if not provided, output will be embedded in the response)
         request: optional pre-built XML request document, prevents building of request from other arguments
         response: optional pre-built XML response document, prevents submission of request to live WPS server
+        stream: True to serialize and send the request incrementally, without building it in memory (for very large ComplexData inputs)
         """
         
         # instantiate a WPSExecution object
         print 'Executing WPS request...'
         execution = WPSExecution(version=self.version, url=self.url, username=self.username, password=self.password, verbose=self.verbose)
 
+        # build and submit the XML request in a single pass
+        if stream and request is None and response is None:
+            response = execution.submitStreamingRequest(identifier, inputs, output)
+            execution.parseResponse(response)
+            return execution
+
         # build XML request from parameters 
         if request is None:
            requestElement = execution.buildRequest(identifier, inputs, output)
@@ -259,7 +426,93 @@ class WebProcessingService(object):
         execution.parseResponse(response)
                         
         return execution
-    
+
+    def executeBatch(self, identifier, inputSets, output=None, maxConcurrent=4, download=False, filepath=None, monitor=None, callback=None):
+        """
+        Runs a WPS process over many sets of inputs, keeping at most 'maxConcurrent' executions running on the server.
+        All the running executions are tracked by a single WPSMonitor, and outputs are downloaded as soon as each job succeeds.
+        Returns one dictionary per input set, in the same order, with keys:
+        'inputs', 'execution', 'status', 'error', 'submitted', 'completed' and 'elapsed' (seconds from submission to completion).
+
+        identifier: the requested process identifier
+        inputSets: iterable of input lists, each as accepted by execute()
+        output: optional identifier for process output reference (if not provided, outputs will be embedded in the responses)
+        maxConcurrent: maximum number of executions submitted and not yet complete
+        download: True to download the outputs of each succeeded job
+        filepath: optional output file name pattern, formatted with the job index (e.g. 'stats-%d.csv'),
+                  otherwise file names will be inferred from the response documents
+        monitor: optional WPSMonitor used to poll the executions
+        callback: optional function(result) invoked with the result dictionary of each completed job
+        """
+
+        if monitor is None:
+            monitor = WPSMonitor(threads=maxConcurrent)
+
+        results = [{'inputs': inputs, 'execution': None, 'status': None, 'error': None,
+                    'submitted': None, 'completed': None, 'elapsed': None} for inputs in inputSets]
+        queue = range(len(results))
+        active = set()
+
+        def submit(index):
+            result = results[index]
+            execution = WPSExecution(version=self.version, url=self.url, username=self.username, password=self.password, verbose=self.verbose)
+            result['execution'] = execution
+            result['submitted'] = time.time()
+            try:
+                request = etree.tostring(execution.buildRequest(identifier, result['inputs'], output))
+                execution.updateStatus(execution.submitRequest(request))
+            except Exception, err:
+                result['error'] = err
+            return index
+
+        def complete(index, job=None):
+            result = results[index]
+            active.discard(index)
+            result['completed'] = time.time()
+            result['elapsed'] = result['completed'] - result['submitted']
+            execution = result['execution']
+            result['status'] = execution.status
+            if job is not None and job.exception is not None:
+                result['error'] = job.exception
+            elif download and execution.isSucceded():
+                try:
+                    if filepath is not None:
+                        execution.getOutput(filepath=filepath % index)
+                    else:
+                        execution.getOutput()
+                except Exception, err:
+                    result['error'] = err
+            if callback is not None:
+                callback(result)
+
+        while queue or active:
+            # fill the free execution slots
+            indexes = queue[:maxConcurrent - len(active)]
+            queue = queue[len(indexes):]
+            if len(indexes) > 1:
+                pool = ThreadPool(len(indexes))
+                try:
+                    submitted = pool.map(submit, indexes)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                submitted = [submit(index) for index in indexes]
+
+            for index in submitted:
+                active.add(index)
+                if results[index]['error'] is not None:
+                    complete(index)
+                else:
+                    job = monitor.add(results[index]['execution'])
+                    job.add_done_callback(lambda job, index=index: complete(index, job))
+
+            if active:
+                wait = monitor.poll()
+                if wait is not None and active:
+                    sleep(wait)
+
+        return results
         
     def _parseProcessMetadata(self, rootElement):
         """
@@ -267,7 +520,22 @@ class WebProcessingService(object):
         """
         
         processDescriptionElement = rootElement.find( 'ProcessDescription' )
+        return self._parseProcessDescription(processDescriptionElement)
+
+    def _parseProcessDescription(self, processDescriptionElement):
+        """
+        Method to parse a <ProcessDescription> XML element, cache and return the constructed Process object
+        """
+
         process = Process(processDescriptionElement, verbose=self.verbose)
+        self.cache.put(self.url, self._cacheVersion, process)
+        self._addProcess(process)
+        return process
+
+    def _addProcess(self, process):
+        """
+        Method to add a Process to the object metadata
+        """
     
         # override existing processes in object metadata, if existing already
         found = False
@@ -278,8 +546,6 @@ class WebProcessingService(object):
         # otherwise add it
         if not found:
             self.processes.append(process)
-            
-        return process
                 
         
     def _parseCapabilitiesMetadata(self, root):         
@@ -287,6 +553,11 @@ class WebProcessingService(object):
         
         # use the WPS namespace defined in the document root
         wpsns = getNamespace(root)
+
+        # each capabilities document replaces the previous one
+        self.updateSequence = root.get('updateSequence')
+        self.operations = []
+        self.processes = []
         
         # loop over children WITHOUT requiring a specific namespace
         for element in root:
@@ -439,6 +710,63 @@ class WPSExecuteReader(WPSReader):
          return self._readFromUrl(url, data, method, username=username, password=password)
 
     
+class ChunkedRequest(object):
+    """
+    File-like object that POSTs whatever is written to it to a URL, using HTTP chunked transfer encoding,
+    so that a request body of any size can be sent without holding it in memory.
+    """
+
+    def __init__(self, url, username=None, password=None, chunkSize=65536, contentType='text/xml'):
+        self.url = url
+        self.chunkSize = chunkSize
+        self._buffer = []
+        self._size = 0
+        
+        scheme, netloc, path, query, fragment = urlparse.urlsplit(url)
+        if scheme == 'https':
+            self._connection = httplib.HTTPSConnection(netloc)
+        else:
+            self._connection = httplib.HTTPConnection(netloc)
+        if query:
+            path = '%s?%s' % (path, query)
+        self._connection.putrequest('POST', path or '/')
+        self._connection.putheader('Content-Type', contentType)
+        self._connection.putheader('Transfer-Encoding', 'chunked')
+        if username and password:
+            self._connection.putheader('Authorization', 'Basic %s' % base64.b64encode('%s:%s' % (username, password)))
+        self._connection.endheaders()
+
+    def write(self, data):
+        self._buffer.append(data)
+        self._size += len(data)
+        if self._size >= self.chunkSize:
+            self._sendChunk()
+
+    def flush(self):
+        pass
+
+    def _sendChunk(self):
+        if self._size > 0:
+            self._connection.send('%x\r\n%s\r\n' % (self._size, ''.join(self._buffer)))
+        self._buffer = []
+        self._size = 0
+
+    def close(self):
+        """
+        Sends the end of the request body and returns the response document as a string.
+        """
+        self._sendChunk()
+        self._connection.send('0\r\n\r\n')
+        response = self._connection.getresponse()
+        content = response.read()
+        self._connection.close()
+        if response.status in [400, 401]:
+            raise ServiceException, content
+        elif response.status >= 300:
+            raise HTTPError(self.url, response.status, response.reason, response.msg, None)
+        return content
+
+
 class WPSExecution():
     """
     Class that represents a single WPS process executed on a remote WPS service.
@@ -465,6 +793,7 @@ class WPSExecution():
         self.status = None
         self.errors = []
         self.statusLocation = None
+        self.percentCompleted = None
         self.dataInputs=[]
         self.processOutputs=[]
         
@@ -487,14 +816,10 @@ class WPSExecution():
         #             service="WPS" 
         #             version="1.0.0" 
         #             xsi:schemaLocation="http://www.opengis.net/wps/1.0.0 http://schemas.opengis.net/wps/1.0.0/wpsExecute_request.xsd">       
-        root = etree.Element(nspath_eval('wps:Execute', namespaces))
-        root.set('service', 'WPS')
-        root.set('version', WPS_DEFAULT_VERSION)
-        root.set(nspath_eval('xsi:schemaLocation', namespaces), '%s %s' % (namespaces['wps'], WPS_DEFAULT_SCHEMA_LOCATION) )
+        root = etree.Element(nspath_eval('wps:Execute', namespaces), attrib=self._executeAttributes())
         
         # <ows:Identifier>gov.usgs.cida.gdp.wps.algorithm.FeatureWeightedGridStatisticsAlgorithm</ows:Identifier>
-        identifierElement = etree.SubElement(root, nspath_eval('ows:Identifier', namespaces))
-        identifierElement.text = identifier
+        root.append( self._identifierElement(identifier) )
         
         # <wps:DataInputs>
         dataInputsElement = etree.SubElement(root, nspath_eval('wps:DataInputs', namespaces))
@@ -502,8 +827,7 @@ class WPSExecution():
         for (key,val) in inputs:
 
             inputElement = etree.SubElement(dataInputsElement, nspath_eval('wps:Input', namespaces))
-            identifierElement = etree.SubElement(inputElement, nspath_eval('ows:Identifier', namespaces))
-            identifierElement.text = key
+            inputElement.append( self._identifierElement(key) )
             
             # Literal data
             # <wps:Input>
@@ -513,9 +837,7 @@ class WPSExecution():
             #   </wps:Data>
             # </wps:Input>
             if isinstance(val, str):
-                dataElement = etree.SubElement(inputElement, nspath_eval('wps:Data', namespaces))
-                literalDataElement = etree.SubElement(dataElement, nspath_eval('wps:LiteralData', namespaces))
-                literalDataElement.text = val
+                inputElement.append( self._literalDataElement(val) )
                 
             # Complex data
             # <wps:Input>
@@ -545,16 +867,67 @@ class WPSExecution():
         #   </wps:ResponseDocument>
         # </wps:ResponseForm>
         if output is not None:
-            responseFormElement = etree.SubElement(root, nspath_eval('wps:ResponseForm', namespaces))
-            responseDocumentElement = etree.SubElement(responseFormElement, nspath_eval('wps:ResponseDocument', namespaces), 
-                                                       attrib={'storeExecuteResponse':'true', 'status':'true'} )
-            outputElement = etree.SubElement(responseDocumentElement, nspath_eval('wps:Output', namespaces), 
-                                                       attrib={'asReference':'true'} )
-            outputIdentifierElement = etree.SubElement(outputElement, nspath_eval('ows:Identifier', namespaces)).text = output
-                  
+            root.append( self._responseFormElement(output) )
 
         return root
-                
+
+    def writeRequest(self, out, identifier, inputs=[], output=None):
+        """
+        Method to write a WPS process request to a file-like object, with the same arguments as buildRequest().
+        With lxml, the document is serialized incrementally: ComplexData inputs that provide a 'writeXml(xf)' method
+        (e.g. GMLMultiPolygonFeatureCollection) write their content directly to the output, without building an XML tree in memory.
+        
+        out: file-like object, the XML document is passed to its write() method
+        """
+        
+        if not hasattr(etree, 'xmlfile'):
+            # no incremental serializer, write the whole document at once
+            out.write(etree.tostring(self.buildRequest(identifier, inputs, output)))
+            return
+
+        with etree.xmlfile(out, encoding='UTF-8') as xf:
+            xf.write_declaration()
+            with xf.element(nspath_eval('wps:Execute', namespaces), self._executeAttributes(),
+                            nsmap=dict([(k, namespaces[k]) for k in ['wps', 'ows', 'xlink', 'xsi']])):
+                xf.write( self._identifierElement(identifier) )
+                with xf.element(nspath_eval('wps:DataInputs', namespaces)):
+                    for (key,val) in inputs:
+                        with xf.element(nspath_eval('wps:Input', namespaces)):
+                            xf.write( self._identifierElement(key) )
+                            if isinstance(val, str):
+                                xf.write( self._literalDataElement(val) )
+                            elif hasattr(val, 'writeXml'):
+                                val.writeXml(xf)
+                            else:
+                                xf.write( val.getXml() )
+                if output is not None:
+                    xf.write( self._responseFormElement(output) )
+
+    def _executeAttributes(self):
+        return OrderedDict([('service', 'WPS'),
+                            ('version', WPS_DEFAULT_VERSION),
+                            (nspath_eval('xsi:schemaLocation', namespaces), '%s %s' % (namespaces['wps'], WPS_DEFAULT_SCHEMA_LOCATION))])
+
+    def _identifierElement(self, identifier):
+        identifierElement = etree.Element(nspath_eval('ows:Identifier', namespaces))
+        identifierElement.text = identifier
+        return identifierElement
+
+    def _literalDataElement(self, value):
+        dataElement = etree.Element(nspath_eval('wps:Data', namespaces))
+        literalDataElement = etree.SubElement(dataElement, nspath_eval('wps:LiteralData', namespaces))
+        literalDataElement.text = value
+        return dataElement
+
+    def _responseFormElement(self, output):
+        responseFormElement = etree.Element(nspath_eval('wps:ResponseForm', namespaces))
+        responseDocumentElement = etree.SubElement(responseFormElement, nspath_eval('wps:ResponseDocument', namespaces), 
+                                                   attrib={'storeExecuteResponse':'true', 'status':'true'} )
+        outputElement = etree.SubElement(responseDocumentElement, nspath_eval('wps:Output', namespaces), 
+                                                   attrib={'asReference':'true'} )
+        outputIdentifierElement = etree.SubElement(outputElement, nspath_eval('ows:Identifier', namespaces)).text = output
+        return responseFormElement
+
     # wait for 60 seconds by default
     def checkStatus(self, url=None, response=None, sleepSecs=60):
         """
@@ -588,6 +961,25 @@ class WPSExecution():
             print 'Sleeping %d seconds...' % sleepSecs
             sleep(sleepSecs)
 
+
+    def updateStatus(self, response=None):
+        """
+        Method to check the status of a job execution without printing or sleeping.
+        Returns the current status.
+
+        response: optional status document (XML string or etree element) to parse instead of requesting the 'statusLocation' URL.
+        """
+
+        reader = WPSExecuteReader(verbose=self.verbose)
+        if response is None:
+            response = reader.readFromUrl(self.statusLocation, username=self.username, password=self.password)
+        elif isinstance(response, basestring):
+            response = reader.readFromString(response)
+
+        # store latest response
+        self.response = etree.tostring(response)
+        self._parseResponse(response)
+        return self.status
         
     def getStatus(self):
         return self.status
@@ -611,54 +1003,108 @@ class WPSExecution():
     def isNotComplete(self):
         return not self.isComplete()
         
-    def getOutput(self, filepath=None):
+    def getOutput(self, filepath=None, chunkSize=65536, resume=False, threads=4, identifiers=None):
         """
-        Method to write the output of a WPS process to a file: 
-        either retrieve the referenced file from the server, or write out the content of response embedded output.
+        Method to write the outputs of a WPS process to files, one file per output:
+        either stream the referenced file from the server, or write out the content of response embedded output.
+        Referenced outputs are downloaded concurrently in chunks of 'chunkSize' bytes, and interrupted
+        downloads are resumed with HTTP Range requests. Returns the list of files written.
         
         filepath: optional path to the output file, otherwise a file will be created in the local directory with the name assigned by the server, 
-                  or default name 'wps.out' for embedded output.
+                  or default name 'wps.out' for embedded output. When the process has several outputs, the output identifier
+                  is appended to the file name (e.g. 'result-OUTPUT.csv').
+        chunkSize: number of bytes read and written at a time
+        resume: True to complete existing partial files from a previous interrupted invocation, instead of overwriting them
+        threads: maximum number of referenced outputs downloaded concurrently
+        identifiers: optional list of output identifiers to write, the others are skipped; file names are the same as when writing all outputs
         """
         
-        if self.isSucceded():
-            content = ''
-            for output in self.processOutputs:
-                
-                # ExecuteResponse contains reference to server-side output
+        if not self.isSucceded():
+            raise Exception("Execution not successfully completed: status=%s" % self.status)
+
+        outputs = [output for output in self.processOutputs if output.reference is not None or len(output.data)>0]
+
+        references = []
+        filepaths = []
+        for output in outputs:
+            
+            # output file name
+            path = filepath
+            if path is None:
                 if output.reference is not None:
                     # a) 'http://cida.usgs.gov/climate/gdp/process/RetrieveResultServlet?id=1318528582026OUTPUT.601bb3d0-547f-4eab-8642-7c7d2834459e'
                     # b) 'http://rsg.pml.ac.uk/wps/wpsoutputs/outputImage-11294Bd6l2a.tif'
-                    url = output.reference
-                    print 'Output URL=%s' % url
-                    if '?' in url:
-                        spliturl=url.split('?')
-                        u = openURL(spliturl[0], spliturl[1], method='Get', username = self.username, password = self.password)
+                    if '?' in output.reference:
                         # extract output filepath from URL query string
-                        if filepath is None:
-                            filepath = spliturl[1].split('=')[1]
+                        path = output.reference.split('?')[1].split('=')[1]
                     else:
-                        u = openURL(url, '', method='Get', username = self.username, password = self.password)
                         # extract output filepath from base URL
-                        if filepath is None:
-                            filepath = url.split('/')[-1]
-                    content = content + u.read()
+                        path = output.reference.split('/')[-1]
+                else:
+                    path = 'wps.out'
+            # server-assigned names are already distinct
+            if len(outputs)>1 and (filepath is not None or output.reference is None):
+                path = self._outputFilepath(path, output)
+            if identifiers is not None and output.identifier not in identifiers:
+                continue
+            filepaths.append(path)
+                
+            # ExecuteResponse contains reference to server-side output
+            if output.reference is not None:
+                print 'Output URL=%s' % output.reference
+                references.append((output.reference, path))
                  
-                # ExecuteResponse contain embedded output   
-                if len(output.data)>0:
-                    if filepath is None:
-                        filepath = 'wps.out'
-                    for data in output.data:
-                        content = content + data
-                    
-            # write out content
-            if content is not '':
-                out = open(filepath, 'wb')
-                out.write(content)
+            # ExecuteResponse contain embedded output   
+            else:
+                out = open(path, 'wb')
+                for data in output.data:
+                    if isinstance(data, unicode):
+                        data = data.encode('utf-8')
+                    out.write(data)
                 out.close()
-                print 'Output written to file: %s' %filepath
-            
+                print 'Output written to file: %s' % path
+
+        def fetch(reference):
+            url, path = reference
+            download(url, path, username=self.username, password=self.password, chunksize=chunkSize, resume=resume)
+            return path
+
+        if len(references)>1 and threads>1:
+            pool = ThreadPool(min(threads, len(references)))
+            try:
+                written = pool.map(fetch, references)
+            finally:
+                pool.close()
+                pool.join()
         else:
-            raise Exception("Execution not successfully completed: status=%s" % self.status)
+            written = [fetch(reference) for reference in references]
+        for path in written:
+            print 'Output written to file: %s' % path
+
+        return filepaths
+
+    def _outputFilepath(self, filepath, output):
+        """
+        Method to derive the file name of one of several outputs, by appending the output identifier to filepath.
+        """
+        root, ext = os.path.splitext(filepath)
+        return '%s-%s%s' % (root, output.identifier, ext)
+    
+    def submitStreamingRequest(self, identifier, inputs=[], output=None, chunkSize=65536):
+        """
+        Builds and submits a WPS Execute document to a remote service in a single pass: the document is serialized
+        incrementally (see writeRequest()) and sent with HTTP chunked transfer encoding.
+        Returns the XML response document from the server. The request document is not kept.
+        
+        chunkSize: number of bytes sent at a time
+        """
+        
+        writer = ChunkedRequest(self.url, username=self.username, password=self.password, chunkSize=chunkSize)
+        self.writeRequest(writer, identifier, inputs, output)
+        response = etree.fromstring(writer.close())
+        self.request = None
+        self.response = response
+        return response
     
     def submitRequest(self, request):
         """
@@ -690,7 +1136,19 @@ class WPSExecution():
         """
         Method to parse a WPS response document
         """
-    
+
+        self._parseResponse(response)
+
+        # print status, errors
+        print 'Execution status=%s' % self.status
+        for error in self.errors:
+            dump(error)
+
+    def _parseResponse(self, response):
+        """
+        Method to parse a WPS response document, without printing
+        """
+
         rootTag = response.tag.split('}')[1]
         # <ns0:ExecuteResponse>
         if rootTag == 'ExecuteResponse':
@@ -702,11 +1160,6 @@ class WPSExecution():
             
         else:
             print 'Unknown Response'
-            
-        # print status, errors
-        print 'Execution status=%s' % self.status
-        for error in self.errors:
-            dump(error)
 
             
     def _parseExceptionReport(self, root):
@@ -730,7 +1183,13 @@ class WPSExecution():
         wpsns = getNamespace(root)
 
         self.serviceInstance = root.get( 'serviceInstance' )
-        self.statusLocation = root.get( 'statusLocation' )
+        if root.get( 'statusLocation' ) is not None:
+            self.statusLocation = root.get( 'statusLocation' )
+
+        # each status document replaces the previous one
+        self.errors = []
+        self.dataInputs = []
+        self.processOutputs = []
         
         # <ns0:Status creationTime="2011-11-09T14:19:50Z">
         #  <ns0:ProcessSucceeded>PyWPS Process v.net.path successfully calculated</ns0:ProcessSucceeded>
@@ -747,6 +1206,10 @@ class WPSExecution():
         # </ns0:Status>
         statusEl = root.find( nspath('Status/*', ns=wpsns) )
         self.status = statusEl.tag.split('}')[1]
+        # <ns0:ProcessStarted percentCompleted="40">
+        self.percentCompleted = None
+        if statusEl.get('percentCompleted') is not None:
+            self.percentCompleted = int(statusEl.get('percentCompleted'))
         # exceptions ?
         for element in statusEl:
             if element.tag.endswith('ExceptionReport'):
@@ -1192,11 +1655,23 @@ class GMLMultiPolygonFeatureCollection(FeatureCollection):
     
     def __init__(self, polygons):
         '''
-        Initializer accepts an array of polygons, where each polygon is an array of (lat,lon) tuples.
+        Initializer accepts an array of polygons, where each polygon is an array of (lat,lon) tuples,
+        or a NumPy array of shape (number of vertices, 2).
         Example: polygons = [ [(-102.8184, 39.5273), (-102.8184, 37.418), (-101.2363, 37.418), (-101.2363, 39.5273), (-102.8184, 39.5273)],
                               [(-92.8184, 39.5273), (-92.8184, 37.418), (-91.2363, 37.418), (-91.2363, 39.5273), (-92.8184, 39.5273)] ]
         '''
         self.polygons = polygons
+
+    def _posList(self, polygon, size=10000):
+        '''
+        Generator of the 'x y x y ...' text of a polygon, in pieces of at most 'size' vertices.
+        NumPy arrays are formatted a block of vertices at a time.
+        '''
+        for start in range(0, len(polygon), size):
+            if hasattr(polygon, 'ravel'):
+                yield ' '.join(map(str, polygon[start:start+size].ravel().tolist()))
+            else:
+                yield ' '.join(["%s %s" % (x, y) for x, y in polygon[start:start+size] ])
     
     def getXml(self):
         '''
@@ -1244,11 +1719,39 @@ class GMLMultiPolygonFeatureCollection(FeatureCollection):
             exteriorElement = etree.SubElement(polygonElement, nspath_eval('gml:exterior', namespaces))
             linearRingElement = etree.SubElement(exteriorElement, nspath_eval('gml:LinearRing', namespaces))
             posListElement = etree.SubElement(linearRingElement, nspath_eval('gml:posList', namespaces))
-            posListElement.text =  ' '.join(["%s %s" % (x, y) for x, y in polygon[:] ])
+            posListElement.text =  ' '.join(self._posList(polygon))
         
         idElement = etree.SubElement(boxElement, nspath_eval('gml:ID', namespaces))
         idElement.text = "0"
         return dataElement
+
+    def writeXml(self, xf):
+        '''
+        Writes the same XML as getXml() to an lxml incremental serializer (etree.xmlfile),
+        one polygon at a time, without building the document in memory.
+        '''
+        with xf.element(nspath_eval('wps:Data', namespaces)):
+            with xf.element(nspath_eval('wps:ComplexData', namespaces),
+                            OrderedDict([("mimeType", "text/xml"), ("encoding", "UTF-8"), ("schema", GML_SCHEMA_LOCATION)])):
+                with xf.element(nspath_eval('gml:featureMembers', namespaces),
+                                { nspath_eval("xsi:schemaLocation",namespaces):"%s %s" % (DRAW_NAMESPACE, DRAW_SCHEMA_LOCATION)}):
+                    with xf.element(nspath_eval('gml:box', namespaces), { nspath_eval("gml:id",namespaces):"box.1" }):
+                        with xf.element(nspath_eval('gml:the_geom', namespaces)):
+                            with xf.element(nspath_eval('gml:MultiPolygon', namespaces),
+                                            OrderedDict([("srsDimension", "2"), ("srsName", "http://www.opengis.net/gml/srs/epsg.xml#4326")])):
+                                for polygon in self.polygons:
+                                    with xf.element(nspath_eval('gml:polygonMember', namespaces)):
+                                        with xf.element(nspath_eval('gml:Polygon', namespaces)):
+                                            with xf.element(nspath_eval('gml:exterior', namespaces)):
+                                                with xf.element(nspath_eval('gml:LinearRing', namespaces)):
+                                                    with xf.element(nspath_eval('gml:posList', namespaces)):
+                                                        for n, text in enumerate(self._posList(polygon)):
+                                                            if n > 0:
+                                                                xf.write(' ')
+                                                            xf.write(text)
+                        idElement = etree.Element(nspath_eval('gml:ID', namespaces))
+                        idElement.text = "0"
+                        xf.write(idElement)
     
 def monitorExecution(execution, sleepSecs=3, download=False, filepath=None):
     '''
@@ -1277,6 +1780,192 @@ def monitorExecution(execution, sleepSecs=3, download=False, filepath=None):
         for ex in execution.errors:
             print 'Error: code=%s, locator=%s, text=%s' % (ex.code, ex.locator, ex.text)
 
+class WPSJob(object):
+    '''
+    Handle on a WPS execution tracked by a WPSMonitor, in the style of a future:
+    done() tells whether the execution has completed, result() returns the
+    WPSExecution once it has succeeded.
+    '''
+
+    def __init__(self, execution, callback=None, interval=2):
+        self.execution = execution
+        self.callback = callback
+        self.interval = interval
+        self.due = 0
+        self.polls = 0
+        self.failures = 0
+        self.exception = None
+        self._done = False
+        self._doneCallbacks = []
+
+    def done(self):
+        return self._done
+
+    def add_done_callback(self, fn):
+        '''
+        Registers fn(job), called once the execution completes (immediately if it already has).
+        '''
+        if self._done:
+            fn(self)
+        else:
+            self._doneCallbacks.append(fn)
+
+    def result(self):
+        '''
+        Returns the WPSExecution of a succeeded job, raises an Exception if it failed or is still running.
+        '''
+        if not self._done:
+            raise Exception('Execution not completed: status=%s' % self.execution.status)
+        if self.exception is not None:
+            raise self.exception
+        if not self.execution.isSucceded():
+            raise Exception('Execution not successfully completed: status=%s' % self.execution.status)
+        return self.execution
+
+    def _finish(self, exception=None):
+        self.exception = exception
+        self._done = True
+        for fn in self._doneCallbacks:
+            fn(self)
+        self._doneCallbacks = []
+
+
+class WPSMonitor(object):
+    '''
+    Single-thread scheduler that polls the 'statusLocation' of many WPS executions.
+    Each job is polled on its own adaptive interval: the interval grows by 'backoff' every poll
+    that shows no progress (up to 'maxInterval'), and goes back to 'interval' when the status changes.
+    Status changes are reported through callbacks instead of printed:
+    
+        monitor = WPSMonitor(callback=lambda execution, old, new: log.info('%s: %s -> %s', execution.statusLocation, old, new))
+        job = monitor.add(wps.execute(identifier, inputs, output))
+        job.add_done_callback(lambda job: job.execution.getOutput())
+        monitor.run()
+    '''
+
+    def __init__(self, interval=2, maxInterval=60, backoff=1.5, maxErrors=5, threads=1, callback=None):
+        '''
+        interval: initial number of seconds between two status checks of a job
+        maxInterval: maximum number of seconds between two status checks of a job
+        backoff: factor applied to the interval of a job after a check without progress
+        maxErrors: number of consecutive failed status requests after which a job is abandoned
+        threads: number of status documents requested concurrently
+        callback: optional function(execution, oldStatus, newStatus) invoked on every status change
+        '''
+        self.interval = interval
+        self.maxInterval = maxInterval
+        self.backoff = backoff
+        self.maxErrors = maxErrors
+        self.threads = threads
+        self.callback = callback
+        self.jobs = []
+
+    def add(self, execution, callback=None):
+        '''
+        Starts tracking a WPSExecution, returns its WPSJob.
+        callback: optional function(execution, oldStatus, newStatus), overrides the monitor callback for this job
+        '''
+        job = WPSJob(execution, callback or self.callback, self.interval)
+        if self._isComplete(execution):
+            job._finish()
+        else:
+            job.due = time.time()
+            self.jobs.append(job)
+        return job
+
+    def pending(self):
+        '''
+        Returns the jobs not completed yet.
+        '''
+        return [job for job in self.jobs if not job.done()]
+
+    def _isComplete(self, execution):
+        return execution.status in ('ProcessSucceeded', 'ProcessFailed', 'Exception') or \
+            (execution.statusLocation is None and execution.status is not None)
+
+    def _fetch(self, job):
+        execution = job.execution
+        reader = WPSExecuteReader(verbose=execution.verbose)
+        try:
+            return reader.readFromUrl(execution.statusLocation, username=execution.username, password=execution.password), None
+        except Exception, err:
+            return None, err
+
+    def poll(self):
+        '''
+        Checks the status of every job that is due, without sleeping.
+        Returns the number of seconds until the next job is due, or None when all jobs are complete.
+        '''
+        now = time.time()
+        due = [job for job in self.jobs if job.due <= now]
+
+        if len(due) > 1 and self.threads > 1:
+            pool = ThreadPool(min(self.threads, len(due)))
+            try:
+                responses = pool.map(self._fetch, due)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            responses = [self._fetch(job) for job in due]
+
+        for job, (response, error) in zip(due, responses):
+            self._update(job, response, error)
+
+        self.jobs = self.pending()
+        if not self.jobs:
+            return None
+        return max(min([job.due for job in self.jobs]) - time.time(), 0)
+
+    def _update(self, job, response, error):
+        execution = job.execution
+        job.polls += 1
+
+        if error is not None:
+            job.failures += 1
+            if job.failures >= self.maxErrors:
+                job._finish(error)
+                return
+            job.interval = min(job.interval * self.backoff, self.maxInterval)
+            job.due = time.time() + job.interval
+            return
+        job.failures = 0
+
+        oldStatus, oldPercent = execution.status, execution.percentCompleted
+        try:
+            execution.updateStatus(response)
+        except Exception, err:
+            job._finish(err)
+            return
+
+        if execution.status != oldStatus or execution.percentCompleted != oldPercent:
+            job.interval = self.interval
+            if job.callback is not None and execution.status != oldStatus:
+                job.callback(execution, oldStatus, execution.status)
+        else:
+            job.interval = min(job.interval * self.backoff, self.maxInterval)
+        job.due = time.time() + job.interval
+
+        if self._isComplete(execution):
+            job._finish()
+
+    def run(self, timeout=None):
+        '''
+        Polls the jobs until all of them are complete, or until timeout seconds have elapsed.
+        Returns the list of jobs still pending.
+        '''
+        if timeout is not None:
+            deadline = time.time() + timeout
+        wait = self.poll()
+        while wait is not None:
+            if timeout is not None:
+                if time.time() + wait > deadline:
+                    break
+            sleep(wait)
+            wait = self.poll()
+        return self.pending()
+
+
 def printValue(value):
     '''
     Utility method to format a value for printing.
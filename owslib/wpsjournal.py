@@ -0,0 +1,248 @@
+# -*- coding: ISO-8859-15 -*-
+
+"""
+Persistent journal of WPS executions
+
+WPSJournal records in a SQLite database every execution submitted
+through it: the request document, the statusLocation returned by the
+server, each status transition and each output downloaded.  After a
+restart, resume() rebuilds the unfinished WPSExecution objects from the
+journal and polls them again through a WPSMonitor, without submitting
+the processes again:
+
+    journal = WPSJournal('jobs.db')
+    monitor = WPSMonitor()
+    journal.resume(monitor)  # jobs left over by a previous run
+    jobid, job = journal.execute(wps, identifier, inputs, output='OUTPUT', monitor=monitor)
+    monitor.run()
+    journal.getOutput(jobid, job.execution)
+
+"""
+
+import sqlite3
+import time
+
+from owslib.etree import etree
+from owslib.wps import WPSExecution, WPS_DEFAULT_VERSION
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT NOT NULL,
+        version TEXT,
+        identifier TEXT,
+        request BLOB,
+        statuslocation TEXT,
+        status TEXT,
+        submitted REAL,
+        updated REAL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS events (
+        job INTEGER NOT NULL,
+        time REAL,
+        status TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS outputs (
+        job INTEGER NOT NULL,
+        output TEXT NOT NULL,
+        reference TEXT,
+        filepath TEXT,
+        time REAL,
+        PRIMARY KEY (job, output)
+    )'''
+]
+
+# status of a job submitted but whose response was never recorded
+SUBMITTING = 'Submitting'
+
+COMPLETE = ['ProcessSucceeded', 'ProcessFailed', 'Exception']
+
+
+class WPSJournal(object):
+    """ SQLite backed journal of WPS executions """
+    def __init__(self, database=':memory:'):
+        """
+
+        Open (and create if needed) a job journal
+
+        Parameters
+        ----------
+
+        - database: path to the SQLite database file (default is ':memory:')
+
+        """
+
+        self.database = database
+        self.connection = sqlite3.connect(database)
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+    def close(self):
+        """ Close the underlying database connection """
+        self.connection.close()
+
+    def add(self, url, identifier=None, request=None, version=WPS_DEFAULT_VERSION):
+        """ Record a job about to be submitted and return its id """
+        now = time.time()
+        if request is not None:
+            request = sqlite3.Binary(request)
+        with self.connection:
+            cursor = self.connection.execute('INSERT INTO jobs (url, version, identifier, request, status, submitted, updated) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, version, identifier, request, SUBMITTING, now, now))
+            jobid = cursor.lastrowid
+            self.connection.execute('INSERT INTO events (job, time, status) VALUES (?, ?, ?)', (jobid, now, SUBMITTING))
+        return jobid
+
+    def update(self, jobid, execution):
+        """ Record the statusLocation and status of the WPSExecution of a job, if they changed """
+        row = self.connection.execute('SELECT statuslocation, status FROM jobs WHERE id = ?', (jobid,)).fetchone()
+        if row is None:
+            raise KeyError(jobid)
+        if (execution.statusLocation, execution.status) == tuple(row):
+            return
+        now = time.time()
+        with self.connection:
+            self.connection.execute('UPDATE jobs SET statuslocation = ?, status = ?, updated = ? WHERE id = ?',
+                (execution.statusLocation, execution.status, now, jobid))
+            if execution.status != row[1]:
+                self.connection.execute('INSERT INTO events (job, time, status) VALUES (?, ?, ?)', (jobid, now, execution.status))
+
+    def execute(self, wps, identifier, inputs, output=None, monitor=None):
+        """
+
+        Submit a WPS process and journal it.  Returns the job id, and the
+        WPSJob tracking the execution if a monitor is given, otherwise the
+        WPSExecution.
+
+        Parameters
+        ----------
+
+        - wps: a WebProcessingService object
+        - identifier: the requested process identifier
+        - inputs: list of process inputs, as in WebProcessingService.execute()
+        - output: optional identifier for process output reference
+        - monitor: optional WPSMonitor that will poll the execution
+
+        """
+
+        execution = WPSExecution(version=wps.version, url=wps.url, username=wps.username, password=wps.password, verbose=wps.verbose)
+        request = etree.tostring(execution.buildRequest(identifier, inputs, output))
+
+        # journal the request before submitting, a crash in between leaves a job in SUBMITTING state, never resubmitted
+        jobid = self.add(wps.url, identifier, request, wps.version)
+        execution.updateStatus(execution.submitRequest(request))
+        self.update(jobid, execution)
+
+        if monitor is None:
+            return jobid, execution
+        return jobid, self.track(jobid, execution, monitor)
+
+    def track(self, jobid, execution, monitor):
+        """ Add the execution of a job to a WPSMonitor, journaling its status transitions.  Returns the WPSJob """
+        callback = monitor.callback
+
+        def journal(execution, oldStatus, newStatus):
+            self.update(jobid, execution)
+            if callback is not None:
+                callback(execution, oldStatus, newStatus)
+
+        job = monitor.add(execution, journal)
+        job.add_done_callback(lambda job: self.update(jobid, job.execution))
+        return job
+
+    def jobs(self, unfinished=False):
+        """ Iterate over the journaled jobs as dicts, optionally only the unfinished ones """
+        columns = ['id', 'url', 'version', 'identifier', 'statuslocation', 'status', 'submitted', 'updated']
+        sql = 'SELECT %s FROM jobs' % ', '.join(columns)
+        if unfinished:
+            sql += ' WHERE status NOT IN (%s)' % ', '.join(['?'] * len(COMPLETE))
+        for row in self.connection.execute(sql + ' ORDER BY id', unfinished and COMPLETE or ()):
+            yield dict(zip(columns, row))
+
+    def events(self, jobid):
+        """ Return the list of (time, status) transitions of a job """
+        return self.connection.execute('SELECT time, status FROM events WHERE job = ? ORDER BY rowid', (jobid,)).fetchall()
+
+    def getrequest(self, jobid):
+        """ Return the request document of a job """
+        row = self.connection.execute('SELECT request FROM jobs WHERE id = ?', (jobid,)).fetchone()
+        if row is None:
+            raise KeyError(jobid)
+        if row[0] is None:
+            return None
+        return str(row[0])
+
+    def execution(self, jobid, username=None, password=None):
+        """ Rebuild the WPSExecution of a job from the journal """
+        row = self.connection.execute('SELECT url, version, request, statuslocation, status FROM jobs WHERE id = ?', (jobid,)).fetchone()
+        if row is None:
+            raise KeyError(jobid)
+        url, version, request, statuslocation, status = row
+        execution = WPSExecution(version=version, url=url, username=username, password=password)
+        if request is not None:
+            execution.request = str(request)
+        execution.statusLocation = statuslocation
+        if status != SUBMITTING:
+            execution.status = status
+        return execution
+
+    def resume(self, monitor, username=None, password=None):
+        """
+
+        Poll again the unfinished jobs with a known statusLocation, and
+        return the list of (job id, WPSJob).  Jobs whose submission was
+        interrupted before the server answered are left alone: they may or
+        may not be running, and are never submitted again automatically.
+
+        Parameters
+        ----------
+
+        - monitor: the WPSMonitor that will poll the executions
+        - username: optional user name for the status requests
+        - password: optional password for the status requests
+
+        """
+
+        resumed = []
+        for job in list(self.jobs(unfinished=True)):
+            if job['status'] == SUBMITTING or job['statuslocation'] is None:
+                continue
+            execution = self.execution(job['id'], username, password)
+            resumed.append((job['id'], self.track(job['id'], execution, monitor)))
+        return resumed
+
+    def downloaded(self, jobid):
+        """ Return a dict of the outputs of a job already downloaded: output identifier -> file path """
+        rows = self.connection.execute('SELECT output, filepath FROM outputs WHERE job = ?', (jobid,)).fetchall()
+        return dict(rows)
+
+    def getOutput(self, jobid, execution, filepath=None):
+        """
+
+        Download the outputs of a succeeded job that are not journaled as
+        downloaded yet, completing partial files left by an interrupted
+        run, and journal them.  Returns the list of files written.
+
+        Parameters
+        ----------
+
+        - jobid: the job id
+        - execution: the succeeded WPSExecution of the job
+        - filepath: optional path to the output file, as in WPSExecution.getOutput()
+
+        """
+
+        done = self.downloaded(jobid)
+        remaining = [o for o in execution.processOutputs
+                     if o.identifier not in done and (o.reference is not None or len(o.data) > 0)]
+        if not remaining:
+            return []
+        written = execution.getOutput(filepath=filepath, resume=True, identifiers=[o.identifier for o in remaining])
+
+        now = time.time()
+        with self.connection:
+            for output, path in zip(remaining, written):
+                self.connection.execute('INSERT OR REPLACE INTO outputs (job, output, reference, filepath, time) VALUES (?, ?, ?, ?, ?)',
+                    (jobid, output.identifier, output.reference, path, now))
+        return written